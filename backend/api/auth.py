@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, or_, func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -9,22 +11,45 @@ from database import get_db
 from models import User as UserModel
 from schemas import User, UserCreate, UserLogin, Token, TokenData
 from config import settings
+from services import PasswordHasher, HasherBusyError, TTLCache
 
 router = APIRouter()
 
 # Security Configuration
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
+# Active users keyed by token subject (username). Entries are detached from any
+# session and must be invalidated whenever the row changes.
+user_cache = TTLCache(
+    "auth_user_cache",
+    maxsize=settings.auth_user_cache_size,
+    ttl=settings.auth_user_cache_ttl
+)
+
+
+def hasher_busy_exception() -> HTTPException:
+    """503 returned when the password hashing queue is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy. Please try again shortly.",
+        headers={"Retry-After": "1"},
+    )
+
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -40,28 +65,35 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return encoded_jwt
 
 
-def get_user_by_username(db: Session, username: str):
+async def get_user_by_username(db: AsyncSession, username: str):
     """Get user by username"""
-    return db.query(UserModel).filter(UserModel.username == username).first()
-
-
-def get_user_by_email(db: Session, email: str):
-    """Get user by email"""
-    return db.query(UserModel).filter(UserModel.email == email).first()
+    result = await db.execute(select(UserModel).where(UserModel.username == username))
+    return result.scalars().first()
+
+
+async def get_user_by_login(db: AsyncSession, login: str):
+    """Get user by username or email (case-insensitive) in a single query"""
+    login = login.lower()
+    username_match = func.lower(UserModel.username) == login
+    result = await db.execute(
+        select(UserModel)
+        .where(or_(username_match, func.lower(UserModel.email) == login))
+        .order_by(case((username_match, 0), else_=1))
+        .limit(1)
+    )
+    return result.scalars().first()
 
 
-def authenticate_user(db: Session, username: str, password: str):
+async def authenticate_user(db: AsyncSession, username: str, password: str):
     """Authenticate user by username/email and password"""
-    user = get_user_by_username(db, username)
-    if not user:
-        user = get_user_by_email(db, username)
+    user = await get_user_by_login(db, username)
     
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await verify_password(password, user.hashed_password):
         return False
     return user
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,9 +110,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_username(db, username=token_data.username)
+    user = user_cache.get(token_data.username)
+    if user is not None:
+        return user
+    
+    user = await get_user_by_username(db, username=token_data.username)
     if user is None:
         raise credentials_exception
+    if user.is_active:
+        db.expunge(user)
+        user_cache.set(token_data.username, user)
     return user
 
 
@@ -98,18 +137,11 @@ async def register_options():
 
 
 @router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     try:
-        # Check if user already exists (single non-enumerable message — SEC-05)
-        if get_user_by_username(db, user_data.username) or get_user_by_email(db, user_data.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username or email already registered."
-            )
-
-        # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        # Create new user; uniqueness is enforced by the username/email indexes
+        hashed_password = await get_password_hash(user_data.password)
         db_user = UserModel(
             email=user_data.email,
             username=user_data.username,
@@ -122,12 +154,22 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
         
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # Single non-enumerable message — SEC-05
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username or email already registered."
+            )
+        await db.refresh(db_user)
         
         return db_user
     except HTTPException:
         raise
+    except HasherBusyError:
+        raise hasher_busy_exception()
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -142,9 +184,12 @@ async def login_options():
 
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Login user and return access token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except HasherBusyError:
+        raise hasher_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
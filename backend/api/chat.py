@@ -1,77 +1,562 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from openai import AsyncOpenAI
-from datetime import datetime, timedelta
+from datetime import timedelta
+from contextlib import asynccontextmanager
+import asyncio
+import copy
+import hashlib
 import json
+import math
+import re
+import time
 
-from database import get_db
-from models import User as UserModel, Itinerary as ItineraryModel, ChatHistory
-from schemas import ChatMessage, ChatResponse, ItineraryGenerationRequest
+from database import get_db, SessionLocal
+from models import User as UserModel, Itinerary as ItineraryModel, ChatHistory, ItineraryJob as ItineraryJobModel
+from schemas import (
+    ChatMessage, ChatResponse, ItineraryGenerationRequest, ItineraryJob,
+    TranslationBatchRequest, TranslationBatchResponse
+)
 from api.auth import get_current_active_user
+from services import (
+    keyset_paginate, split_page, InvalidCursorError, ChatHistoryWriter, TTLCache, SingleFlight,
+    ItineraryJobManager, JobQueueFullError, PromptTemplate, compact_json, count_tokens,
+    ConversationMemory, Conversation, OpenAILimiter, ModelRouter, ModelRoute, StreamingObjectParser
+)
+from services.llm_metrics import record_completion, record_stream
+from services.conversation_memory import row_key
+from services.openai_limiter import RETRYABLE_ERRORS
+from services.prompts import count_message_tokens
 from config import settings
+from metrics import registry
 
 router = APIRouter()
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=settings.openai_api_key)
+# Initialize OpenAI client; retries (429s, connection errors, timeouts, 5xx) are left to the limiter
+client = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    base_url=settings.openai_base_url or None,
+    max_retries=0
+)
+
+# Model per request class from settings, falling back to a faster tier when the
+# primary breaks its latency SLO or error budget
+model_router = ModelRouter(
+    {
+        "chat": ModelRoute(settings.model_chat, settings.model_chat_fallback, settings.model_chat_slo_p95),
+        "itinerary": ModelRoute(settings.model_itinerary, settings.model_itinerary_fallback, settings.model_itinerary_slo_p95),
+        "translate": ModelRoute(settings.model_translate, settings.model_translate_fallback, settings.model_translate_slo_p95),
+        "summary": ModelRoute(settings.model_summary, settings.model_summary_fallback, settings.model_summary_slo_p95),
+    },
+    window_size=settings.model_route_window_size,
+    window_seconds=settings.model_route_window_seconds,
+    min_samples=settings.model_route_min_samples,
+    max_error_rate=settings.model_route_max_error_rate,
+    probe_ratio=settings.model_route_probe_ratio
+)
+
+# Limiter priority class per request class; summaries are background work
+REQUEST_PRIORITIES = {"chat": "chat", "translate": "translate", "itinerary": "itinerary", "summary": "itinerary"}
+
+# Admission control shared by every OpenAI call: chat before translation before itineraries
+openai_limiter = OpenAILimiter(
+    max_concurrency=settings.openai_max_concurrency,
+    tokens_per_minute=settings.openai_tokens_per_minute,
+    max_retries=settings.openai_max_retries,
+    backoff_base=settings.openai_backoff_base,
+    backoff_max=settings.openai_backoff_max
+)
+
+# Batches chat history inserts off the response path; started/stopped in main.lifespan
+chat_history_writer = ChatHistoryWriter(
+    SessionLocal,
+    batch_size=settings.chat_history_batch_size,
+    flush_interval=settings.chat_history_flush_interval,
+    max_buffer=settings.chat_history_max_buffer,
+    max_backoff=settings.chat_history_max_backoff
+)
+
+# Replies to near-identical messages asked with the same preferences/context
+chat_response_cache = TTLCache(
+    "chat_response_cache",
+    maxsize=settings.chat_cache_size,
+    ttl=settings.chat_cache_ttl,
+    max_entry_size=settings.chat_cache_max_entry_chars
+)
+
+# Generated itineraries, shared by identical trip requests; concurrent identical
+# requests are coalesced onto a single OpenAI call
+itinerary_cache = TTLCache(
+    "itinerary_cache",
+    maxsize=settings.itinerary_cache_size,
+    ttl=settings.itinerary_cache_ttl
+)
+itinerary_generation = SingleFlight("itinerary_generation")
+itinerary_llm_calls = registry.counter("itinerary_llm_calls")
+itinerary_calls_saved = registry.counter("itinerary_calls_saved")
+itinerary_chunked_generations = registry.counter("itinerary_chunked_generations")
+
+
+class ItineraryProgress:
+    """Days produced so far by an in-flight itinerary generation, replayed to every caller streaming it"""
+    
+    def __init__(self):
+        self.days: List[Dict[str, Any]] = []
+        self.changed = asyncio.Event()
+    
+    def add(self, day: Dict[str, Any]):
+        self.days.append(day)
+        # Wake current waiters; later waiters wait on a fresh event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+# Progress of streamed generations in itinerary_generation, by itinerary cache key
+itinerary_progress: Dict[str, ItineraryProgress] = {}
+
+# Translation memory: translated strings keyed by (source hash, target language)
+translation_memory = TTLCache(
+    "translation_memory",
+    maxsize=settings.translation_memory_size,
+    ttl=settings.translation_memory_ttl
+)
+translation_llm_calls = registry.counter("translation_llm_calls")
+translation_truncated = registry.counter("translation_truncated")
+
+# Output budget per source token; translations into other scripts can take more tokens than their source
+TRANSLATION_OUTPUT_RATIO = 2
+TRANSLATION_MAX_TOKENS = 4000
+
+
+class TranslationTruncatedError(Exception):
+    """The model's translation was cut off by max_tokens"""
+
+
+def translation_chunks(texts: List[str], max_texts: int, max_tokens: int) -> List[List[str]]:
+    """Group texts, in order, into chunks of at most max_texts strings and max_tokens source tokens"""
+    chunks: List[List[str]] = []
+    chunk: List[str] = []
+    chunk_tokens = 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if chunk and (len(chunk) >= max_texts or chunk_tokens + tokens > max_tokens):
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], 0
+        chunk.append(text)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+# Streaming chat latency, time-to-first-token reported separately from the full reply
+chat_stream_first_token_seconds = registry.histogram("chat_stream_time_to_first_token_seconds")
+chat_stream_total_seconds = registry.histogram("chat_stream_total_seconds")
+
+
+# Prompt templates are parsed once at import; budgets cap the tokens that
+# user-supplied sections (preferences, context, requirements) may add.
+CHAT_SYSTEM_PROMPT = PromptTemplate(
+    """
+    You are BARABULA, an AI travel companion. You help users plan trips, provide travel recommendations,
+    and assist with travel-related questions. Be helpful, friendly, and provide practical travel advice.
+    
+    If users ask about specific destinations, provide information about:
+    - Best time to visit
+    - Popular attractions
+    - Local cuisine recommendations
+    - Transportation options
+    - Cultural tips
+    - Budget considerations
+    
+    Keep responses concise but informative.
+    
+    User preferences: {preferences}
+    Current context: {context}
+    Earlier in this conversation: {summary}
+    """,
+    budgets={
+        "preferences": settings.prompt_preferences_token_budget,
+        "context": settings.prompt_context_token_budget,
+        "summary": settings.prompt_summary_token_budget
+    },
+    optional=("preferences", "context", "summary")
+)
+
+CONVERSATION_SUMMARY_PROMPT = PromptTemplate(
+    """
+    You maintain a running summary of a conversation between a traveller and BARABULA, an AI travel companion.
+    Update the summary with the new exchanges below. Keep destinations, dates, budgets, preferences and decisions;
+    drop pleasantries. Reply with the updated summary only, in at most {max_words} words.
+    
+    Current summary: {summary}
+    
+    New exchanges:
+    {turns}
+    """,
+    budgets={"summary": settings.prompt_summary_token_budget},
+    optional=("summary",)
+)
+
+CHAT_ERROR_RESPONSE = "I'm sorry, I'm having trouble processing your request right now. Please try again later."
+
+ITINERARY_PROMPT = PromptTemplate(
+    """
+    Create a detailed {duration}-day travel itinerary for {destination}.
+    
+    Trip Details:
+    - Destination: {destination}
+    - Start Date: {start_date}
+    - End Date: {end_date}
+    - Duration: {duration} days
+    - Group Size: {group_size}
+    - Travel Style: {travel_style}
+    - Budget: {budget}
+    - Interests: {interests}
+    
+    Special Requirements: {special_requirements}
+    
+    Please provide a JSON response with the following structure:
+    {{
+        "title": "Trip title",
+        "description": "Brief description",
+        "daily_activities": [
+            {{
+                "day": 1,
+                "date": "YYYY-MM-DD",
+                "activities": [
+                    {{
+                        "title": "Activity name",
+                        "description": "Activity description",
+                        "category": "attraction|restaurant|transport|accommodation",
+                        "start_time": "HH:MM",
+                        "duration_minutes": 120,
+                        "estimated_cost": 50,
+                        "location": {{
+                            "address": "Full address",
+                            "latitude": 0.0,
+                            "longitude": 0.0
+                        }},
+                        "notes": "Additional tips or notes"
+                    }}
+                ]
+            }}
+        ],
+        "estimated_total_cost": 1000,
+        "recommendations": [
+            "General travel tip 1",
+            "General travel tip 2"
+        ]
+    }}
+    
+    Make sure activities are realistic and well-timed throughout each day.
+    """,
+    budgets={
+        "destination": 50,
+        "interests": settings.prompt_interests_token_budget,
+        "special_requirements": settings.prompt_requirements_token_budget
+    },
+    optional=("special_requirements",)
+)
+
+ITINERARY_SYSTEM_PROMPT = "You are a professional travel planner. Generate practical, detailed itineraries in the exact JSON format requested."
+
+# Long trips: a light outline of the whole trip, then day ranges planned against it in parallel
+ITINERARY_OUTLINE_PROMPT = PromptTemplate(
+    """
+    Outline a {duration}-day travel itinerary for {destination}.
+    
+    Trip Details:
+    - Destination: {destination}
+    - Start Date: {start_date}
+    - End Date: {end_date}
+    - Duration: {duration} days
+    - Group Size: {group_size}
+    - Travel Style: {travel_style}
+    - Budget: {budget}
+    - Interests: {interests}
+    
+    Special Requirements: {special_requirements}
+    
+    Each day will be planned in detail separately, so only give it a theme, the area it covers and its main sights. Spread the sights across the trip and do not repeat any.
+    
+    Please provide a JSON response with the following structure:
+    {{
+        "title": "Trip title",
+        "description": "Brief description",
+        "days": [
+            {{"day": 1, "theme": "Day theme", "area": "Area or neighbourhood", "highlights": ["Main sight"]}}
+        ],
+        "estimated_total_cost": 1000,
+        "recommendations": [
+            "General travel tip 1",
+            "General travel tip 2"
+        ]
+    }}
+    """,
+    budgets={
+        "destination": 50,
+        "interests": settings.prompt_interests_token_budget,
+        "special_requirements": settings.prompt_requirements_token_budget
+    },
+    optional=("special_requirements",)
+)
+
+ITINERARY_DAYS_PROMPT = PromptTemplate(
+    """
+    Plan days {first_day} to {last_day} ({range_start} to {range_end}) of a {duration}-day travel itinerary for {destination} in detail.
+    
+    Trip Details:
+    - Destination: {destination}
+    - Start Date: {start_date}
+    - End Date: {end_date}
+    - Duration: {duration} days
+    - Group Size: {group_size}
+    - Travel Style: {travel_style}
+    - Budget: {budget}
+    - Interests: {interests}
+    
+    Special Requirements: {special_requirements}
+    
+    Trip outline (other days are planned from it too; follow each day's theme and area and do not include sights listed for other days): {outline}
+    
+    Please provide a JSON response with the following structure:
+    {{
+        "daily_activities": [
+            {{
+                "day": {first_day},
+                "date": "YYYY-MM-DD",
+                "activities": [
+                    {{
+                        "title": "Activity name",
+                        "description": "Activity description",
+                        "category": "attraction|restaurant|transport|accommodation",
+                        "start_time": "HH:MM",
+                        "duration_minutes": 120,
+                        "estimated_cost": 50,
+                        "location": {{
+                            "address": "Full address",
+                            "latitude": 0.0,
+                            "longitude": 0.0
+                        }},
+                        "notes": "Additional tips or notes"
+                    }}
+                ]
+            }}
+        ]
+    }}
+    
+    Include exactly days {first_day} to {last_day}. Make sure activities are realistic and well-timed throughout each day.
+    """,
+    budgets={
+        "destination": 50,
+        "interests": settings.prompt_interests_token_budget,
+        "special_requirements": settings.prompt_requirements_token_budget,
+        "outline": 1500
+    },
+    optional=("special_requirements", "outline")
+)
+
+TRANSLATE_BATCH_PROMPT = PromptTemplate(
+    """
+    You are a professional translator. Translate every value of the JSON object the user sends to {target_language}.
+    Respond with a JSON object of the form {{"translations": {{"<key>": "<translated text>"}}}} using exactly the same keys. Only return translated text as values.
+    """,
+    budgets={"target_language": 20}
+)
+
+
+def chat_cache_key(message: str, context: Dict = None, user_preferences: Dict = None) -> Optional[Tuple[str, str]]:
+    """Response cache key for a chat message, or None if the reply must not be shared.
+
+    The message is normalized (case, punctuation, whitespace) and paired with a
+    hash of the preferences/context embedded in the system prompt. Clients opt
+    out by sending ``"personalized": true`` in the context.
+    """
+    if context and context.get("personalized"):
+        return None
+    normalized = " ".join(re.sub(r"[^\w\s]", " ", message.lower()).split())
+    fingerprint = hashlib.sha256(
+        json.dumps({"preferences": user_preferences or {}, "context": context or {}}, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return normalized, fingerprint
+
+
+def cache_itinerary(key: str, itinerary_data: Dict[str, Any]):
+    """Cache a generated itinerary unless it is a fallback template or a partial salvage"""
+    if not {"error", "raw_response", "incomplete"} & itinerary_data.keys():
+        itinerary_cache.set(key, itinerary_data)
+
+
+def itinerary_cache_key(request: ItineraryGenerationRequest, user_preferences: Dict = None) -> str:
+    """Canonical key for an itinerary request: normalized trip fields plus a preferences fingerprint"""
+    trip = request.model_dump(mode="json")
+    trip["destination"] = " ".join(request.destination.lower().split())
+    trip["interests"] = sorted({interest.strip().lower() for interest in request.interests})
+    payload = json.dumps({"trip": trip, "preferences": user_preferences or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def translation_memory_key(text: str, target_language: str) -> Tuple[str, str]:
+    """Translation memory key for a source string"""
+    return hashlib.sha256(text.encode()).hexdigest(), target_language.strip().lower()
+
+
+def split_day_ranges(duration: int, chunk_days: int) -> List[Tuple[int, int]]:
+    """Split days 1..duration into (first day, day count) ranges of at most chunk_days, as even as possible"""
+    chunks = max(1, math.ceil(duration / chunk_days))
+    size, extra = divmod(duration, chunks)
+    ranges = []
+    first_day = 1
+    for index in range(chunks):
+        count = size + (1 if index < extra else 0)
+        ranges.append((first_day, count))
+        first_day += count
+    return ranges
+
+
+def itinerary_day_ranges(request: ItineraryGenerationRequest) -> List[Tuple[int, int]]:
+    """Day ranges an itinerary is generated in; a single range means one call for the whole trip"""
+    duration = (request.end_date - request.start_date).days
+    if not settings.itinerary_chunk_days or duration <= settings.itinerary_chunk_days:
+        return [(1, duration)]
+    return split_day_ranges(duration, settings.itinerary_chunk_days)
+
+
+def activities_cost(daily_activities: List[Dict[str, Any]]) -> float:
+    """Sum of the estimated activity costs in daily_activities"""
+    return sum(
+        activity["estimated_cost"]
+        for day in daily_activities
+        for activity in day.get("activities") or []
+        if isinstance(activity, dict) and isinstance(activity.get("estimated_cost"), (int, float))
+    )
+
+
+def estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Tokens a completion request may consume: the prompt plus the completion allowance"""
+    return count_message_tokens(messages) + max_tokens
+
+
+async def create_completion(request_class: str, **kwargs) -> Any:
+    """Chat completion on the model routed for request_class, admitted through the shared limiter"""
+    model = model_router.choose(request_class)
+    estimated = estimate_request_tokens(kwargs["messages"], kwargs.get("max_tokens", 0))
+
+    async def attempt():
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(model=model, **kwargs)
+        except Exception:
+            model_router.record(request_class, model, time.perf_counter() - started, ok=False)
+            raise
+        model_router.record(request_class, model, time.perf_counter() - started, ok=True)
+        return response
+
+    return await openai_limiter.call(REQUEST_PRIORITIES[request_class], estimated, attempt)
+
+
+@asynccontextmanager
+async def stream_completion(request_class: str, **kwargs) -> AsyncIterator[Any]:
+    """Streaming chat completion; the limiter slot is held, and latency measured, until the block exits"""
+    model = model_router.choose(request_class)
+    estimated = estimate_request_tokens(kwargs["messages"], kwargs.get("max_tokens", 0))
+    started = time.perf_counter()
+
+    async def open_stream():
+        nonlocal started
+        started = time.perf_counter()
+        return await client.chat.completions.create(model=model, stream=True, **kwargs)
+
+    try:
+        async with openai_limiter.stream(REQUEST_PRIORITIES[request_class], estimated, open_stream) as stream:
+            yield stream
+    except Exception:
+        model_router.record(request_class, model, time.perf_counter() - started, ok=False)
+        raise
+    model_router.record(request_class, model, time.perf_counter() - started, ok=True)
 
 
 class AIService:
     """AI service for chat and itinerary generation"""
     
     @staticmethod
-    async def generate_chat_response(message: str, context: Dict = None, user_preferences: Dict = None) -> Dict[str, Any]:
+    def build_chat_messages(
+        message: str,
+        context: Dict = None,
+        user_preferences: Dict = None,
+        conversation: Optional[Conversation] = None
+    ) -> List[Dict[str, str]]:
+        """Build the chat completion messages for a user message and the conversation so far"""
+        system_prompt = CHAT_SYSTEM_PROMPT.render(
+            preferences=user_preferences,
+            context=context,
+            summary=conversation.summary if conversation else None
+        )
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        if conversation:
+            for previous_message, previous_response in conversation.turns:
+                messages.append({"role": "user", "content": previous_message})
+                messages.append({"role": "assistant", "content": previous_response})
+        messages.append({"role": "user", "content": message})
+        return messages
+    
+    @staticmethod
+    def suggest_followups(message: str) -> List[str]:
+        """Generate suggestions based on the conversation"""
+        if "destination" in message.lower() or "where" in message.lower():
+            return [
+                "Tell me about popular attractions",
+                "What's the best time to visit?",
+                "Help me plan an itinerary",
+                "What's the local cuisine like?"
+            ]
+        if "itinerary" in message.lower() or "plan" in message.lower():
+            return [
+                "Generate a 3-day itinerary",
+                "Add restaurant recommendations",
+                "Include cultural activities",
+                "Suggest nearby attractions"
+            ]
+        return []
+    
+    @staticmethod
+    async def generate_chat_response(
+        message: str,
+        context: Dict = None,
+        user_preferences: Dict = None,
+        conversation: Optional[Conversation] = None
+    ) -> Dict[str, Any]:
         """Generate AI chat response"""
+        # Only opening messages are answered from the cache; later replies depend on the conversation
+        cache_key = chat_cache_key(message, context, user_preferences) if not conversation or conversation.is_empty else None
+        cached_response = chat_response_cache.get(cache_key) if cache_key else None
+        if cached_response is not None:
+            return {
+                "response": cached_response,
+                "suggestions": AIService.suggest_followups(message),
+                "context": context or {}
+            }
+        
         try:
-            # Build system prompt based on context
-            system_prompt = """You are BARABULA, an AI travel companion. You help users plan trips, provide travel recommendations, 
-            and assist with travel-related questions. Be helpful, friendly, and provide practical travel advice. 
-            
-            If users ask about specific destinations, provide information about:
-            - Best time to visit
-            - Popular attractions
-            - Local cuisine recommendations
-            - Transportation options
-            - Cultural tips
-            - Budget considerations
-            
-            Keep responses concise but informative."""
-            
-            if user_preferences:
-                system_prompt += f"\n\nUser preferences: {json.dumps(user_preferences)}"
-            
-            if context:
-                system_prompt += f"\n\nCurrent context: {json.dumps(context)}"
-            
-            response = await client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
+            messages = AIService.build_chat_messages(message, context, user_preferences, conversation)
+            started = time.perf_counter()
+            response = await create_completion(
+                "chat",
+                messages=messages,
                 max_tokens=500,
                 temperature=0.7
             )
+            record_completion("chat", time.perf_counter() - started, messages, response)
             
             ai_response = response.choices[0].message.content
+            suggestions = AIService.suggest_followups(message)
             
-            # Generate suggestions based on the conversation
-            suggestions = []
-            if "destination" in message.lower() or "where" in message.lower():
-                suggestions = [
-                    "Tell me about popular attractions",
-                    "What's the best time to visit?",
-                    "Help me plan an itinerary",
-                    "What's the local cuisine like?"
-                ]
-            elif "itinerary" in message.lower() or "plan" in message.lower():
-                suggestions = [
-                    "Generate a 3-day itinerary",
-                    "Add restaurant recommendations",
-                    "Include cultural activities",
-                    "Suggest nearby attractions"
-                ]
+            if cache_key and ai_response:
+                chat_response_cache.set(cache_key, ai_response, size=len(ai_response))
             
             return {
                 "response": ai_response,
@@ -82,102 +567,163 @@ class AIService:
         except Exception as e:
             print(f"Error generating AI response: {e}")
             return {
-                "response": "I'm sorry, I'm having trouble processing your request right now. Please try again later.",
+                "response": CHAT_ERROR_RESPONSE,
                 "suggestions": [],
                 "context": {}
             }
     
+    @staticmethod
+    async def stream_chat_response(
+        message: str,
+        context: Dict = None,
+        user_preferences: Dict = None,
+        conversation: Optional[Conversation] = None
+    ) -> AsyncIterator[str]:
+        """Stream AI chat response text as it is generated"""
+        cache_key = chat_cache_key(message, context, user_preferences) if not conversation or conversation.is_empty else None
+        cached_response = chat_response_cache.get(cache_key) if cache_key else None
+        if cached_response is not None:
+            yield cached_response
+            return
+        
+        messages = AIService.build_chat_messages(message, context, user_preferences, conversation)
+        started = time.perf_counter()
+        parts = []
+        async with stream_completion(
+            "chat",
+            messages=messages,
+            max_tokens=500,
+            temperature=0.7
+        ) as stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+        
+        ai_response = "".join(parts)
+        record_stream("chat_stream", time.perf_counter() - started, messages, ai_response)
+        if cache_key and ai_response:
+            chat_response_cache.set(cache_key, ai_response, size=len(ai_response))
+    
+    @staticmethod
+    async def summarize_conversation(summary: str, turns: List[Tuple[str, str]]) -> str:
+        """Fold turns that left the conversation window into the rolling summary"""
+        prompt = CONVERSATION_SUMMARY_PROMPT.render(
+            summary=summary,
+            turns="\n".join(f"Traveller: {message}\nBARABULA: {response}" for message, response in turns),
+            max_words=settings.chat_memory_summary_words
+        )
+        messages = [{"role": "user", "content": prompt}]
+        started = time.perf_counter()
+        response = await create_completion(
+            "summary",
+            messages=messages,
+            max_tokens=settings.prompt_summary_token_budget,
+            temperature=0.2
+        )
+        record_completion("chat_summary", time.perf_counter() - started, messages, response)
+        return response.choices[0].message.content.strip()
+    
     @staticmethod
     async def generate_itinerary(request: ItineraryGenerationRequest, user_preferences: Dict = None) -> Dict[str, Any]:
-        """Generate AI-powered itinerary"""
+        """Generate AI-powered itinerary, served from cache or a matching in-flight call when possible"""
+        key = itinerary_cache_key(request, user_preferences)
+        cached = itinerary_cache.get(key)
+        if cached is not None:
+            itinerary_calls_saved.inc()
+            return copy.deepcopy(cached)
+        
+        async def generate() -> Dict[str, Any]:
+            itinerary_data = await AIService._generate_itinerary(request, user_preferences)
+            cache_itinerary(key, itinerary_data)
+            return itinerary_data
+        
+        itinerary_data, shared = await itinerary_generation.do(key, generate)
+        if shared:
+            itinerary_calls_saved.inc()
+        return copy.deepcopy(itinerary_data)
+    
+    @staticmethod
+    def build_itinerary_messages(request: ItineraryGenerationRequest) -> List[Dict[str, str]]:
+        """Build the chat completion messages for an itinerary request"""
+        prompt = ITINERARY_PROMPT.render(**AIService.itinerary_prompt_fields(request))
+        return [
+            {"role": "system", "content": ITINERARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
+    @staticmethod
+    def itinerary_prompt_fields(request: ItineraryGenerationRequest) -> Dict[str, Any]:
+        """Trip details shared by the itinerary prompts"""
+        return {
+            "duration": (request.end_date - request.start_date).days,
+            "destination": request.destination,
+            "start_date": request.start_date.strftime('%Y-%m-%d'),
+            "end_date": request.end_date.strftime('%Y-%m-%d'),
+            "group_size": request.group_size,
+            "travel_style": request.travel_style,
+            "budget": request.budget if request.budget else 'Not specified',
+            "interests": ', '.join(request.interests) if request.interests else 'General tourism',
+            "special_requirements": request.special_requirements
+        }
+    
+    @staticmethod
+    def finish_itinerary(request: ItineraryGenerationRequest, parser: StreamingObjectParser, ai_content: str) -> Dict[str, Any]:
+        """Itinerary data from a parsed completion, salvaging complete days from a broken reply"""
+        itinerary_data = parser.result()
+        if parser.complete:
+            return itinerary_data
+        
+        duration = (request.end_date - request.start_date).days
+        if itinerary_data["daily_activities"]:
+            # Keep the days that arrived intact rather than discarding the whole reply
+            return {
+                "title": f"{duration}-day trip to {request.destination}",
+                "description": "AI-generated itinerary",
+                "estimated_total_cost": request.budget or 0,
+                "recommendations": [],
+                **itinerary_data,
+                "incomplete": True
+            }
+        
+        # Fallback if JSON parsing fails
+        return {
+            "title": f"{duration}-day trip to {request.destination}",
+            "description": "AI-generated itinerary",
+            "daily_activities": [],
+            "estimated_total_cost": request.budget or 0,
+            "recommendations": ["Please try generating the itinerary again for detailed activities."],
+            "raw_response": ai_content
+        }
+    
+    @staticmethod
+    async def _generate_itinerary(request: ItineraryGenerationRequest, user_preferences: Dict = None) -> Dict[str, Any]:
+        """Generate an itinerary with a single OpenAI call, or in parallel day ranges for long trips"""
         try:
-            # Calculate trip duration
-            duration = (request.end_date - request.start_date).days
-            
-            # Build prompt for itinerary generation
-            prompt = f"""Create a detailed {duration}-day travel itinerary for {request.destination}.
-            
-            Trip Details:
-            - Destination: {request.destination}
-            - Start Date: {request.start_date.strftime('%Y-%m-%d')}
-            - End Date: {request.end_date.strftime('%Y-%m-%d')}
-            - Duration: {duration} days
-            - Group Size: {request.group_size}
-            - Travel Style: {request.travel_style}
-            - Budget: {request.budget if request.budget else 'Not specified'}
-            - Interests: {', '.join(request.interests) if request.interests else 'General tourism'}
+            day_ranges = itinerary_day_ranges(request)
+            if len(day_ranges) > 1:
+                async for event, payload in AIService._generate_itinerary_in_chunks(request, day_ranges):
+                    if event == "done":
+                        return payload
             
-            {f'Special Requirements: {request.special_requirements}' if request.special_requirements else ''}
+            messages = AIService.build_itinerary_messages(request)
             
-            Please provide a JSON response with the following structure:
-            {{
-                "title": "Trip title",
-                "description": "Brief description",
-                "daily_activities": [
-                    {{
-                        "day": 1,
-                        "date": "YYYY-MM-DD",
-                        "activities": [
-                            {{
-                                "title": "Activity name",
-                                "description": "Activity description",
-                                "category": "attraction|restaurant|transport|accommodation",
-                                "start_time": "HH:MM",
-                                "duration_minutes": 120,
-                                "estimated_cost": 50,
-                                "location": {{
-                                    "address": "Full address",
-                                    "latitude": 0.0,
-                                    "longitude": 0.0
-                                }},
-                                "notes": "Additional tips or notes"
-                            }}
-                        ]
-                    }}
-                ],
-                "estimated_total_cost": 1000,
-                "recommendations": [
-                    "General travel tip 1",
-                    "General travel tip 2"
-                ]
-            }}
-            
-            Make sure activities are realistic and well-timed throughout each day."""
-            
-            response = await client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional travel planner. Generate practical, detailed itineraries in the exact JSON format requested."},
-                    {"role": "user", "content": prompt}
-                ],
+            itinerary_llm_calls.inc()
+            started = time.perf_counter()
+            response = await create_completion(
+                "itinerary",
+                messages=messages,
                 max_tokens=2000,
                 temperature=0.3,
                 response_format={"type": "json_object"}
             )
+            record_completion("itinerary", time.perf_counter() - started, messages, response)
             
             # Parse the AI response
             ai_content = response.choices[0].message.content
-            
-            # Try to extract JSON from the response
-            try:
-                # Find JSON in the response
-                start_idx = ai_content.find('{')
-                end_idx = ai_content.rfind('}') + 1
-                json_str = ai_content[start_idx:end_idx]
-                
-                itinerary_data = json.loads(json_str)
-                return itinerary_data
-                
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return {
-                    "title": f"{duration}-day trip to {request.destination}",
-                    "description": "AI-generated itinerary",
-                    "daily_activities": [],
-                    "estimated_total_cost": request.budget or 0,
-                    "recommendations": ["Please try generating the itinerary again for detailed activities."],
-                    "raw_response": ai_content
-                }
+            parser = StreamingObjectParser("daily_activities")
+            parser.feed(ai_content)
+            return AIService.finish_itinerary(request, parser, ai_content)
                 
         except Exception as e:
             print(f"Error generating itinerary: {e}")
@@ -189,82 +735,589 @@ class AIService:
                 "recommendations": ["Error generating detailed itinerary. Please try again."],
                 "error": str(e)
             }
+    
+    @staticmethod
+    async def stream_itinerary(
+        request: ItineraryGenerationRequest,
+        user_preferences: Dict = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Generate an itinerary, yielding ``("day", day)`` as each day completes and then ``("done", itinerary)``.
+
+        Shares ``itinerary_generation`` with ``generate_itinerary``: a caller
+        arriving while an identical trip is generating joins that call and
+        first replays the days it already produced (all at the end if it is
+        a non-streaming call). The shared call runs to completion even if
+        this caller goes away.
+        """
+        key = itinerary_cache_key(request, user_preferences)
+        cached = itinerary_cache.get(key)
+        if cached is not None:
+            itinerary_calls_saved.inc()
+            itinerary_data = copy.deepcopy(cached)
+            for day in itinerary_data.get("daily_activities", []):
+                yield "day", day
+            yield "done", itinerary_data
+            return
+        
+        progress = ItineraryProgress()
+        task, shared = itinerary_generation.start(
+            key, lambda: AIService._stream_itinerary_into(request, key, progress)
+        )
+        if shared:
+            itinerary_calls_saved.inc()
+            progress = itinerary_progress.get(key, progress)
+        else:
+            itinerary_progress[key] = progress
+            task.add_done_callback(
+                lambda _: itinerary_progress.pop(key) if itinerary_progress.get(key) is progress else None
+            )
+        
+        sent = 0
+        while True:
+            while sent < len(progress.days):
+                yield "day", copy.deepcopy(progress.days[sent])
+                sent += 1
+            if task.done():
+                break
+            changed = asyncio.ensure_future(progress.changed.wait())
+            try:
+                await asyncio.wait((task, changed), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                changed.cancel()
+        
+        itinerary_data = copy.deepcopy(task.result())
+        if not sent:
+            for day in itinerary_data.get("daily_activities", []):
+                yield "day", day
+        yield "done", itinerary_data
+    
+    @staticmethod
+    async def _stream_itinerary_into(
+        request: ItineraryGenerationRequest,
+        key: str,
+        progress: ItineraryProgress
+    ) -> Dict[str, Any]:
+        """Generate and cache an itinerary, adding each day to progress as soon as it is parsed"""
+        day_ranges = itinerary_day_ranges(request)
+        if len(day_ranges) > 1:
+            async for event, payload in AIService._generate_itinerary_in_chunks(request, day_ranges):
+                if event == "day":
+                    progress.add(payload)
+                else:
+                    cache_itinerary(key, payload)
+                    return payload
+        
+        messages = AIService.build_itinerary_messages(request)
+        parser = StreamingObjectParser("daily_activities")
+        parts = []
+        itinerary_llm_calls.inc()
+        started = time.perf_counter()
+        async with stream_completion(
+            "itinerary",
+            messages=messages,
+            max_tokens=2000,
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        ) as stream:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    for day in parser.feed(chunk.choices[0].delta.content):
+                        progress.add(day)
+        
+        ai_content = "".join(parts)
+        record_stream("itinerary_stream", time.perf_counter() - started, messages, ai_content)
+        itinerary_data = AIService.finish_itinerary(request, parser, ai_content)
+        cache_itinerary(key, itinerary_data)
+        return itinerary_data
+    
+    @staticmethod
+    async def _outline_itinerary(request: ItineraryGenerationRequest) -> Dict[str, Any]:
+        """Theme, area and main sights for every day of the trip; empty if the outline fails"""
+        messages = [
+            {"role": "system", "content": ITINERARY_SYSTEM_PROMPT},
+            {"role": "user", "content": ITINERARY_OUTLINE_PROMPT.render(**AIService.itinerary_prompt_fields(request))}
+        ]
+        try:
+            itinerary_llm_calls.inc()
+            started = time.perf_counter()
+            response = await create_completion(
+                "itinerary",
+                messages=messages,
+                # Title and recommendations, plus theme, area and highlights per day
+                max_tokens=min(4000, 300 + 60 * (request.end_date - request.start_date).days),
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+            record_completion("itinerary_outline", time.perf_counter() - started, messages, response)
+            outline = json.loads(response.choices[0].message.content)
+            return outline if isinstance(outline, dict) else {}
+        except Exception as e:
+            # The day ranges can still be planned from the trip details alone
+            print(f"Error outlining itinerary: {e}")
+            return {}
+    
+    @staticmethod
+    async def _generate_day_range(
+        request: ItineraryGenerationRequest,
+        outline_days: List[Dict[str, Any]],
+        first_day: int,
+        day_count: int
+    ) -> List[Dict[str, Any]]:
+        """Generate days first_day..first_day + day_count - 1, numbered and dated to fit the whole trip"""
+        range_start = request.start_date + timedelta(days=first_day - 1)
+        prompt = ITINERARY_DAYS_PROMPT.render(
+            **AIService.itinerary_prompt_fields(request),
+            first_day=first_day,
+            last_day=first_day + day_count - 1,
+            range_start=range_start.strftime('%Y-%m-%d'),
+            range_end=(range_start + timedelta(days=day_count - 1)).strftime('%Y-%m-%d'),
+            outline=outline_days
+        )
+        messages = [
+            {"role": "system", "content": ITINERARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        itinerary_llm_calls.inc()
+        started = time.perf_counter()
+        response = await create_completion(
+            "itinerary",
+            messages=messages,
+            max_tokens=2000,
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        record_completion("itinerary_chunk", time.perf_counter() - started, messages, response)
+        
+        parser = StreamingObjectParser("daily_activities")
+        parser.feed(response.choices[0].message.content)
+        days = [day for day in parser.result()["daily_activities"] if isinstance(day, dict)][:day_count]
+        for offset, day in enumerate(days):
+            day["day"] = first_day + offset
+            day["date"] = (range_start + timedelta(days=offset)).strftime('%Y-%m-%d')
+        return days
+    
+    @staticmethod
+    async def _generate_itinerary_in_chunks(
+        request: ItineraryGenerationRequest,
+        day_ranges: List[Tuple[int, int]]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Outline the trip, then generate its day ranges concurrently.
+
+        Yields ``("day", day)`` in trip order as ranges finish and then
+        ``("done", itinerary)``. A range that fails or comes back short
+        leaves the itinerary marked incomplete; if every range fails the
+        first error is raised.
+        """
+        itinerary_chunked_generations.inc()
+        duration = (request.end_date - request.start_date).days
+        outline = await AIService._outline_itinerary(request)
+        outline_days = outline.get("days") if isinstance(outline.get("days"), list) else []
+        
+        tasks = [
+            asyncio.ensure_future(AIService._generate_day_range(request, outline_days, first_day, day_count))
+            for first_day, day_count in day_ranges
+        ]
+        daily_activities = []
+        errors = []
+        try:
+            for (first_day, day_count), task in zip(day_ranges, tasks):
+                try:
+                    days = await task
+                except Exception as e:
+                    print(f"Error generating itinerary days {first_day}-{first_day + day_count - 1}: {e}")
+                    errors.append(e)
+                    continue
+                for day in days:
+                    daily_activities.append(day)
+                    yield "day", day
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if len(errors) == len(tasks):
+            raise errors[0]
+        
+        itinerary_data = {
+            "title": outline.get("title") or f"{duration}-day trip to {request.destination}",
+            "description": outline.get("description") or "AI-generated itinerary",
+            "daily_activities": daily_activities,
+            "estimated_total_cost": outline.get("estimated_total_cost") or activities_cost(daily_activities),
+            "recommendations": outline.get("recommendations") or []
+        }
+        if len(daily_activities) < duration:
+            itinerary_data["incomplete"] = True
+        yield "done", itinerary_data
+    
+    @staticmethod
+    async def translate_text(text: str, target_language: str) -> str:
+        """Translate one string, consulting the translation memory first"""
+        key = translation_memory_key(text, target_language)
+        cached = translation_memory.get(key)
+        if cached is not None:
+            return cached
+        
+        messages = [
+            {
+                "role": "system",
+                "content": f"You are a professional translator. Translate the following text to {target_language}. Only return the translated text, nothing else."
+            },
+            {"role": "user", "content": text}
+        ]
+        translation_llm_calls.inc()
+        started = time.perf_counter()
+        response = await create_completion(
+            "translate",
+            messages=messages,
+            max_tokens=min(TRANSLATION_MAX_TOKENS, 50 + TRANSLATION_OUTPUT_RATIO * count_tokens(text)),
+            temperature=0.1
+        )
+        record_completion("translate", time.perf_counter() - started, messages, response)
+        
+        if response.choices[0].finish_reason == "length":
+            translation_truncated.inc()
+            raise TranslationTruncatedError(f"Translation of a {len(text)}-character text was cut off")
+        translated_text = response.choices[0].message.content.strip()
+        translation_memory.set(key, translated_text, size=len(translated_text))
+        return translated_text
+    
+    @staticmethod
+    async def _translate_chunk(texts: List[str], target_language: str) -> Dict[str, str]:
+        """Translate several strings in one structured-output call.
+        
+        Returns source -> translation for the strings the model returned;
+        anything missing or malformed is left for the caller to retry. A reply
+        cut off by max_tokens is discarded and the chunk retried as two halves.
+        """
+        messages = [
+            {"role": "system", "content": TRANSLATE_BATCH_PROMPT.render(target_language=target_language)},
+            {"role": "user", "content": compact_json({str(i): text for i, text in enumerate(texts)})}
+        ]
+        translation_llm_calls.inc()
+        started = time.perf_counter()
+        response = await create_completion(
+            "translate",
+            messages=messages,
+            # Room for the translations of the source, plus JSON overhead per string
+            max_tokens=min(
+                TRANSLATION_MAX_TOKENS,
+                100 + TRANSLATION_OUTPUT_RATIO * sum(count_tokens(text) for text in texts) + 5 * len(texts)
+            ),
+            temperature=0.1,
+            response_format={"type": "json_object"}
+        )
+        record_completion("translate_batch", time.perf_counter() - started, messages, response)
+        
+        if response.choices[0].finish_reason == "length":
+            # Truncated output cannot be trusted, so none of it is cached
+            translation_truncated.inc()
+            if len(texts) == 1:
+                return {}
+            middle = len(texts) // 2
+            halves = await asyncio.gather(
+                AIService._translate_chunk(texts[:middle], target_language),
+                AIService._translate_chunk(texts[middle:], target_language)
+            )
+            return {**halves[0], **halves[1]}
+        
+        try:
+            translations = json.loads(response.choices[0].message.content).get("translations")
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+        if not isinstance(translations, dict):
+            return {}
+        
+        results = {}
+        for i, text in enumerate(texts):
+            translated_text = translations.get(str(i))
+            if isinstance(translated_text, str) and translated_text.strip():
+                translated_text = translated_text.strip()
+                results[text] = translated_text
+                translation_memory.set(
+                    translation_memory_key(text, target_language), translated_text, size=len(translated_text)
+                )
+        return results
+    
+    @staticmethod
+    async def translate_batch(texts: List[str], target_language: str) -> Tuple[List[str], int]:
+        """Translate many strings with as few OpenAI calls as possible.
+        
+        Duplicates and strings already in the translation memory are not sent;
+        the rest go out concurrently in chunks of at most
+        ``translation_batch_size`` strings and ``translation_chunk_tokens``
+        source tokens.
+        Strings a chunk reply left out or garbled are retried one call each,
+        at most ``translation_fallback_concurrency`` at a time. If a chunk call
+        itself fails (rate limited, upstream down) its error is raised rather
+        than multiplied into per-string calls; chunks that did succeed stay in
+        the translation memory. Returns the translations in input order and
+        how many were served from memory.
+        """
+        translated: Dict[str, str] = {}
+        pending: List[str] = []
+        for text in dict.fromkeys(texts):
+            if not text.strip():
+                translated[text] = text
+                continue
+            cached = translation_memory.get(translation_memory_key(text, target_language))
+            if cached is not None:
+                translated[text] = cached
+            else:
+                pending.append(text)
+        from_memory = sum(1 for text in texts if text in translated and text.strip())
+        
+        chunks = translation_chunks(pending, settings.translation_batch_size, settings.translation_chunk_tokens)
+        results = await asyncio.gather(
+            *(AIService._translate_chunk(chunk, target_language) for chunk in chunks),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+        for result in results:
+            translated.update(result)
+        
+        missing = [text for text in pending if text not in translated]
+        if missing:
+            semaphore = asyncio.Semaphore(settings.translation_fallback_concurrency)
+            
+            async def translate_one(text: str) -> str:
+                async with semaphore:
+                    return await AIService.translate_text(text, target_language)
+            
+            singles = await asyncio.gather(*(translate_one(text) for text in missing))
+            translated.update(zip(missing, singles))
+        
+        return [translated[text] for text in texts], from_memory
+
+
+# Recent turns plus a rolling summary per user, so prompts stay flat as chats grow
+conversation_memory = ConversationMemory(
+    SessionLocal,
+    AIService.summarize_conversation,
+    max_turns=settings.chat_memory_turns,
+    cache_size=settings.chat_memory_cache_size,
+    ttl=settings.chat_memory_ttl,
+    pending=chat_history_writer.pending,
+    error_response=CHAT_ERROR_RESPONSE
+)
 
 
 @router.post("/message", response_model=ChatResponse)
 async def send_chat_message(
     message_data: ChatMessage,
-    current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: UserModel = Depends(get_current_active_user)
 ):
     """Send a message to the AI travel assistant"""
+    conversation = await conversation_memory.get(current_user.id)
     response_data = await AIService.generate_chat_response(
         message_data.message,
         message_data.context,
-        current_user.preferences
+        current_user.preferences,
+        conversation
     )
-    
-    # Store chat history in PostgreSQL
-    chat_record = ChatHistory(
+    # Store chat history in PostgreSQL (batched by the write-behind buffer)
+    record = await chat_history_writer.add(
         user_id=current_user.id,
         message=message_data.message,
         response=response_data["response"],
         context=message_data.context or {},
         suggestions=response_data["suggestions"] or []
     )
-    
-    try:
-        db.add(chat_record)
-        db.commit()
-    except Exception as e:
-        print(f"Error storing chat history: {e}")
-        db.rollback()
+    if response_data["response"] != CHAT_ERROR_RESPONSE:
+        conversation_memory.record(
+            current_user.id, conversation, message_data.message, response_data["response"],
+            key=row_key(record["timestamp"], record["id"])
+        )
     
     return ChatResponse(**response_data)
 
 
+# Rows fetched per round trip when streaming an export from a server-side cursor
+EXPORT_BATCH_SIZE = 500
+
+
+def chat_record_to_dict(record) -> Dict[str, Any]:
+    """Serialize a ChatHistory row (ORM object or column row) for API output"""
+    return {
+        "id": record.id,
+        "user_id": record.user_id,
+        "message": record.message,
+        "response": record.response,
+        "context": record.context,
+        "suggestions": record.suggestions,
+        "timestamp": record.timestamp.isoformat()
+    }
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/message/stream")
+async def stream_chat_message(
+    message_data: ChatMessage,
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Send a message to the AI travel assistant and stream the reply.
+
+    Emits Server-Sent Events: ``token`` for each text delta, then ``done``
+    with the full response, suggestions and timing (time to first token and
+    total), or ``error`` if generation fails. History is stored once the
+    reply completes.
+    """
+    user_id = current_user.id
+    user_preferences = current_user.preferences
+    context = message_data.context or {}
+    conversation = await conversation_memory.get(user_id)
+
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_seconds = None
+        parts = []
+        try:
+            async for token in AIService.stream_chat_response(message_data.message, context, user_preferences, conversation):
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+                    chat_stream_first_token_seconds.observe(first_token_seconds)
+                parts.append(token)
+                yield format_sse("token", {"content": token})
+        except Exception as e:
+            print(f"Error streaming AI response: {e}")
+            yield format_sse("error", {"detail": CHAT_ERROR_RESPONSE})
+            return
+        
+        total_seconds = time.perf_counter() - started
+        chat_stream_total_seconds.observe(total_seconds)
+        response_text = "".join(parts)
+        suggestions = AIService.suggest_followups(message_data.message)
+        record = await chat_history_writer.add(
+            user_id=user_id,
+            message=message_data.message,
+            response=response_text,
+            context=context,
+            suggestions=suggestions
+        )
+        conversation_memory.record(
+            user_id, conversation, message_data.message, response_text,
+            key=row_key(record["timestamp"], record["id"])
+        )
+        
+        yield format_sse("done", {
+            "response": response_text,
+            "suggestions": suggestions,
+            "context": context,
+            "timing": {
+                "time_to_first_token_ms": round((first_token_seconds or total_seconds) * 1000, 1),
+                "total_ms": round(total_seconds * 1000, 1)
+            }
+        })
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/history")
 async def get_chat_history(
-    limit: int = 50,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get user's chat history"""
+    """Get user's chat history, newest first"""
     try:
-        chat_records = db.query(ChatHistory).filter(
-            ChatHistory.user_id == current_user.id
-        ).order_by(ChatHistory.timestamp.desc()).limit(limit).all()
-        
-        history = []
-        for record in chat_records:
-            history.append({
-                "id": record.id,
-                "user_id": record.user_id,
-                "message": record.message,
-                "response": record.response,
-                "context": record.context,
-                "suggestions": record.suggestions,
-                "timestamp": record.timestamp.isoformat()
-            })
-        
-        return {"history": history}
+        stmt = keyset_paginate(
+            select(ChatHistory).where(ChatHistory.user_id == current_user.id),
+            ChatHistory.timestamp, ChatHistory.id,
+            cursor, limit, db.bind.dialect.name
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    try:
+        result = await db.execute(stmt)
+        chat_records, next_cursor = split_page(
+            result.scalars().all(), limit, lambda r: (r.timestamp, r.id)
+        )
+        
+        history = [chat_record_to_dict(record) for record in chat_records]
+        
+        return {"history": history, "next_cursor": next_cursor}
     
     except Exception as e:
         print(f"Error retrieving chat history: {e}")
-        return {"history": []}
+        return {"history": [], "next_cursor": None}
 
 
-@router.post("/generate-itinerary")
-async def generate_ai_itinerary(
-    request: ItineraryGenerationRequest,
-    db: Session = Depends(get_db),
+@router.get("/history/export")
+async def export_chat_history(
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """Generate an AI-powered itinerary"""
-    # Generate itinerary using AI
-    itinerary_data = await AIService.generate_itinerary(request, current_user.preferences)
-    
-    # Create itinerary in database
+    """Export the user's full chat history as NDJSON, oldest first.
+
+    Rows are streamed from a server-side cursor in batches, so memory use is
+    constant regardless of how long the history is.
+    """
+    user_id = current_user.id
+
+    async def generate_rows():
+        # Own session: the request-scoped one may be closed before streaming finishes
+        async with SessionLocal() as db:
+            result = await db.stream(
+                select(
+                    ChatHistory.id, ChatHistory.user_id, ChatHistory.message,
+                    ChatHistory.response, ChatHistory.context, ChatHistory.suggestions,
+                    ChatHistory.timestamp
+                )
+                .where(ChatHistory.user_id == user_id)
+                .order_by(ChatHistory.timestamp, ChatHistory.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for partition in result.partitions():
+                yield "".join(json.dumps(chat_record_to_dict(row)) + "\n" for row in partition)
+
+    return StreamingResponse(
+        generate_rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="chat_history.ndjson"'}
+    )
+
+
+def generated_itinerary_extra_data(
+    request: ItineraryGenerationRequest,
+    itinerary_data: Dict[str, Any],
+    generation_status: str
+) -> Dict[str, Any]:
+    """extra_data stored with an AI-generated itinerary"""
+    return {
+        "ai_generated_data": itinerary_data,
+        "generation_request": request.model_dump(mode="json"),
+        "estimated_cost": itinerary_data.get("estimated_total_cost", 0),
+        # in_progress while days are still arriving, then complete, incomplete (salvaged days) or failed
+        "generation_status": generation_status
+    }
+
+
+def itinerary_generation_status(itinerary_data: Dict[str, Any]) -> str:
+    """Final generation status for generated itinerary data"""
+    if itinerary_data.get("error"):
+        return "failed"
+    return "incomplete" if itinerary_data.get("incomplete") else "complete"
+
+
+async def save_generated_itinerary(
+    db: AsyncSession,
+    owner_id: str,
+    request: ItineraryGenerationRequest,
+    itinerary_data: Dict[str, Any],
+    generation_status: Optional[str] = None
+) -> ItineraryModel:
+    """Persist a generated itinerary as a draft owned by owner_id"""
     db_itinerary = ItineraryModel(
         title=itinerary_data.get("title", f"AI Trip to {request.destination}"),
         description=itinerary_data.get("description", "AI-generated travel itinerary"),
@@ -274,17 +1327,118 @@ async def generate_ai_itinerary(
         budget=request.budget,
         status="draft",
         ai_generated=True,
-        extra_data={
-            "ai_generated_data": itinerary_data,
-            "generation_request": request.dict(),
-            "estimated_cost": itinerary_data.get("estimated_total_cost", 0)
-        },
-        owner_id=current_user.id
+        extra_data=generated_itinerary_extra_data(
+            request, itinerary_data, generation_status or itinerary_generation_status(itinerary_data)
+        ),
+        owner_id=owner_id
     )
     
     db.add(db_itinerary)
-    db.commit()
-    db.refresh(db_itinerary)
+    await db.commit()
+    await db.refresh(db_itinerary)
+    return db_itinerary
+
+
+async def generate_and_save_itinerary(
+    db: AsyncSession,
+    owner_id: str,
+    request: ItineraryGenerationRequest,
+    user_preferences: Dict = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Generate an itinerary, saving each day as soon as it is parsed.
+
+    The itinerary row is created up front (``generation_status``
+    in_progress) and yielded as ``("itinerary", {"id": ...})``, so clients can
+    open it while ``("day", day)`` events follow; ``("done", ...)`` carries
+    the final data. If generation fails the days received so far are kept and
+    the status is set to failed before the error is re-raised; if the caller
+    is cancelled or closes the generator first, the status is set to
+    incomplete (failed when no day arrived), so no draft stays in_progress.
+    """
+    db_itinerary = await save_generated_itinerary(
+        db, owner_id, request, {"daily_activities": []}, generation_status="in_progress"
+    )
+    yield "itinerary", {"id": db_itinerary.id}
+    
+    itinerary_id = db_itinerary.id
+    days = []
+    finished = False
+    outcome = None
+    try:
+        async for event, payload in AIService.stream_itinerary(request, user_preferences):
+            if event == "day":
+                days.append(payload)
+                db_itinerary.extra_data = generated_itinerary_extra_data(
+                    request, {"daily_activities": list(days)}, "in_progress"
+                )
+                await db.commit()
+                yield "day", payload
+            else:
+                generation_status = itinerary_generation_status(payload)
+                db_itinerary.title = payload.get("title", db_itinerary.title)
+                db_itinerary.description = payload.get("description", db_itinerary.description)
+                db_itinerary.extra_data = generated_itinerary_extra_data(request, payload, generation_status)
+                await db.commit()
+                finished = True
+                yield "done", {"itinerary_id": itinerary_id, "generation_status": generation_status, "ai_data": payload}
+    except Exception:
+        outcome = "failed"
+        raise
+    except BaseException:
+        # CancelledError, or GeneratorExit when the consumer stops iterating
+        outcome = "incomplete" if days else "failed"
+        raise
+    finally:
+        if outcome and not finished:
+            try:
+                await db.rollback()
+                db_itinerary.extra_data = generated_itinerary_extra_data(request, {"daily_activities": days}, outcome)
+                await db.commit()
+            except Exception as e:
+                print(f"Error marking itinerary {itinerary_id} {outcome}: {e}")
+
+
+async def run_itinerary_job(db: AsyncSession, job: ItineraryJobModel) -> str:
+    """Generate and save the itinerary for a background job, one day at a time"""
+    request = ItineraryGenerationRequest(**job.request)
+    owner = await db.get(UserModel, job.user_id)
+    itinerary_id = None
+    async for event, payload in generate_and_save_itinerary(
+        db, job.user_id, request, owner.preferences if owner else None
+    ):
+        if event == "itinerary":
+            # Let pollers open the itinerary while its days are still arriving
+            itinerary_id = payload["id"]
+            job.itinerary_id = itinerary_id
+            await db.commit()
+    return itinerary_id
+
+
+# Background generation jobs; started/stopped in main.lifespan
+itinerary_job_manager = ItineraryJobManager(
+    SessionLocal,
+    run_itinerary_job,
+    workers=settings.itinerary_job_workers,
+    max_queue=settings.itinerary_job_max_queue,
+    lease_seconds=settings.itinerary_job_lease_seconds
+)
+
+# How often job event streams re-read the job row when no local update arrives
+JOB_POLL_INTERVAL = 2.0
+
+
+@router.post("/generate-itinerary")
+async def generate_ai_itinerary(
+    request: ItineraryGenerationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Generate an AI-powered itinerary"""
+    # Generate itinerary using AI
+    itinerary_data = await AIService.generate_itinerary(request, current_user.preferences)
+    
+    # Create itinerary in database
+    db_itinerary = await save_generated_itinerary(db, current_user.id, request, itinerary_data)
     
     return {
         "itinerary": db_itinerary,
@@ -293,6 +1447,112 @@ async def generate_ai_itinerary(
     }
 
 
+@router.post("/generate-itinerary/stream")
+async def stream_ai_itinerary(
+    request: ItineraryGenerationRequest,
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Generate an AI-powered itinerary and stream it day by day.
+
+    Emits Server-Sent Events: ``itinerary`` with the id of the saved draft as
+    soon as it exists, ``day`` for each day of activities once it is complete
+    (already saved on the itinerary), then ``done`` with the final data, or
+    ``error`` if generation fails.
+    """
+    user_id = current_user.id
+    user_preferences = current_user.preferences
+
+    async def event_stream():
+        # The stream outlives the request's dependencies, so use its own session
+        async with SessionLocal() as db:
+            try:
+                async for event, payload in generate_and_save_itinerary(db, user_id, request, user_preferences):
+                    yield format_sse(event, payload)
+            except Exception as e:
+                print(f"Error streaming itinerary: {e}")
+                yield format_sse("error", {"detail": "Error generating detailed itinerary. Please try again."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/generate-itinerary/jobs", response_model=ItineraryJob, status_code=status.HTTP_202_ACCEPTED)
+async def submit_itinerary_job(
+    request: ItineraryGenerationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Queue itinerary generation and return the job immediately"""
+    try:
+        job = await itinerary_job_manager.submit(db, current_user.id, request.model_dump(mode="json"))
+    except JobQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Itinerary generation is busy. Please try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+    return job
+
+
+async def get_user_job(db: AsyncSession, job_id: str, user_id: str) -> ItineraryJobModel:
+    """Load a job owned by the user or raise 404"""
+    job = await db.get(ItineraryJobModel, job_id, populate_existing=True)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+
+@router.get("/generate-itinerary/jobs/{job_id}", response_model=ItineraryJob)
+async def get_itinerary_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Get the status of an itinerary generation job"""
+    return await get_user_job(db, job_id, current_user.id)
+
+
+@router.get("/generate-itinerary/jobs/{job_id}/events")
+async def stream_itinerary_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Stream job status changes as Server-Sent Events.
+
+    Emits a ``status`` event with the job on every change and closes after
+    the job succeeds or fails.
+    """
+    await get_user_job(db, job_id, current_user.id)
+    user_id = current_user.id
+
+    async def event_stream():
+        last = None
+        while True:
+            # The stream outlives the request's dependencies, so use its own session
+            async with SessionLocal() as session:
+                job = await get_user_job(session, job_id, user_id)
+            data = ItineraryJob.model_validate(job).model_dump(mode="json")
+            if data != last:
+                last = data
+                yield format_sse("status", data)
+            if job.status in ("succeeded", "failed"):
+                return
+            await itinerary_job_manager.wait_for_change(job_id, JOB_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/translate")
 async def translate_text(
     text: str,
@@ -301,20 +1561,7 @@ async def translate_text(
 ):
     """Translate text to target language"""
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a professional translator. Translate the following text to {target_language}. Only return the translated text, nothing else."
-                },
-                {"role": "user", "content": text}
-            ],
-            max_tokens=200,
-            temperature=0.1
-        )
-        
-        translated_text = response.choices[0].message.content.strip()
+        translated_text = await AIService.translate_text(text, target_language)
         
         return {
             "original_text": text,
@@ -330,6 +1577,35 @@ async def translate_text(
         )
 
 
+@router.post("/translate/batch", response_model=TranslationBatchResponse)
+async def translate_texts(
+    request: TranslationBatchRequest,
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Translate many strings in one request, in input order"""
+    try:
+        translations, from_memory = await AIService.translate_batch(request.texts, request.target_language)
+    except RETRYABLE_ERRORS as e:
+        print(f"Error translating texts: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Translation service is busy. Please try again shortly.",
+            headers={"Retry-After": "5"},
+        )
+    except Exception as e:
+        print(f"Error translating texts: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Translation service temporarily unavailable"
+        )
+    
+    return {
+        "translations": translations,
+        "target_language": request.target_language,
+        "from_memory": from_memory
+    }
+
+
 @router.get("/suggestions")
 async def get_conversation_suggestions(
     context: str = "general",
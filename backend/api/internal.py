@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from typing import Optional
+import ipaddress
+import secrets
+
+from database import get_pool_status
+from api.chat import model_router
+from metrics import registry
+from config import settings
+
+
+def is_loopback(host: Optional[str]) -> bool:
+    """Whether a client address is the local machine"""
+    try:
+        return ipaddress.ip_address(host or "").is_loopback
+    except ValueError:
+        return host == "localhost"
+
+
+async def verify_internal_key(request: Request, x_internal_key: Optional[str] = Header(default=None)):
+    """Require the configured internal API key; without one, only local clients are served"""
+    if not settings.internal_api_key:
+        if not is_loopback(request.client.host if request.client else None):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Not Found"
+            )
+        return
+    if not secrets.compare_digest(x_internal_key or "", settings.internal_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid internal API key"
+        )
+
+
+router = APIRouter(dependencies=[Depends(verify_internal_key)])
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get all in-process counters, gauges and histograms"""
+    return registry.snapshot()
+
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    """Get live database connection pool statistics"""
+    return get_pool_status()
+
+
+@router.get("/models")
+async def get_model_routes():
+    """Get model routes, rolling latency/error statistics and the latest routing decisions"""
+    return model_router.snapshot()
@@ -1,38 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Literal, Optional, Union
 
 from database import get_db
-from models import User as UserModel, Itinerary as ItineraryModel, Activity as ActivityModel
+from models import (
+    User as UserModel, Itinerary as ItineraryModel, Activity as ActivityModel,
+    ItineraryCollaborator as ItineraryCollaboratorModel
+)
 from schemas import (
-    Itinerary, ItineraryCreate, ItineraryUpdate,
+    Itinerary, ItineraryCreate, ItineraryUpdate, ItineraryPage, ItinerarySummaryPage,
     Activity, ActivityCreate, ActivityUpdate
 )
 from api.auth import get_current_active_user
+from services import keyset_paginate, split_page, InvalidCursorError
 
 router = APIRouter()
 
+# Relationships serialized by the Itinerary response schema. Lazy loading is not
+# available on an AsyncSession, so these must be loaded eagerly up front.
+# Collections use selectinload so they don't multiply the parent rows.
+itinerary_response_options = (
+    joinedload(ItineraryModel.owner),
+    selectinload(ItineraryModel.collaborators).joinedload(ItineraryCollaboratorModel.user),
+)
+
+# Columns needed by list views, plus a collaborator count computed in SQL
+collaborator_count = (
+    select(func.count(ItineraryCollaboratorModel.id))
+    .where(ItineraryCollaboratorModel.itinerary_id == ItineraryModel.id)
+    .correlate(ItineraryModel)
+    .scalar_subquery()
+    .label("collaborator_count")
+)
+itinerary_summary_columns = (
+    ItineraryModel.id, ItineraryModel.title, ItineraryModel.destination,
+    ItineraryModel.start_date, ItineraryModel.end_date, ItineraryModel.budget,
+    ItineraryModel.currency, ItineraryModel.status, ItineraryModel.is_public,
+    ItineraryModel.ai_generated, ItineraryModel.owner_id,
+    ItineraryModel.created_at, ItineraryModel.updated_at,
+    collaborator_count,
+)
 
-@router.get("/", response_model=List[Itinerary])
+
+@router.get("/", response_model=Union[ItineraryPage, ItinerarySummaryPage])
 async def get_itineraries(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    view: Literal["summary", "full"] = "summary",
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """Get user's itineraries"""
-    itineraries = db.query(ItineraryModel).options(
-        joinedload(ItineraryModel.owner),
-        joinedload(ItineraryModel.collaborators)
-    ).filter(ItineraryModel.owner_id == current_user.id).offset(skip).limit(limit).all()
+    """Get user's itineraries, newest first (summary rows unless view=full)"""
+    if view == "full":
+        stmt = select(ItineraryModel).options(*itinerary_response_options)
+    else:
+        stmt = select(*itinerary_summary_columns)
+    
+    try:
+        stmt = keyset_paginate(
+            stmt.where(ItineraryModel.owner_id == current_user.id),
+            ItineraryModel.created_at, ItineraryModel.id,
+            cursor, limit, db.bind.dialect.name
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return itineraries
+    result = await db.execute(stmt)
+    rows = result.scalars().all() if view == "full" else result.all()
+    itineraries, next_cursor = split_page(rows, limit, lambda i: (i.created_at, i.id))
+    return {"items": itineraries, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=Itinerary, status_code=status.HTTP_201_CREATED)
 async def create_itinerary(
     itinerary_data: ItineraryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Create a new itinerary"""
@@ -42,30 +86,32 @@ async def create_itinerary(
     )
     
     db.add(db_itinerary)
-    db.commit()
-    db.refresh(db_itinerary)
+    await db.commit()
     
     # Load relationships for response
-    db_itinerary = db.query(ItineraryModel).options(
-        joinedload(ItineraryModel.owner),
-        joinedload(ItineraryModel.collaborators)
-    ).filter(ItineraryModel.id == db_itinerary.id).first()
+    result = await db.execute(
+        select(ItineraryModel).options(*itinerary_response_options)
+        .where(ItineraryModel.id == db_itinerary.id)
+        .execution_options(populate_existing=True)
+    )
     
-    return db_itinerary
+    return result.scalars().first()
 
 
 @router.get("/{itinerary_id}", response_model=Itinerary)
 async def get_itinerary(
     itinerary_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get itinerary by ID"""
-    itinerary = db.query(ItineraryModel).options(
-        joinedload(ItineraryModel.owner),
-        joinedload(ItineraryModel.collaborators),
-        joinedload(ItineraryModel.activities)
-    ).filter(ItineraryModel.id == itinerary_id).first()
+    result = await db.execute(
+        select(ItineraryModel).options(
+            *itinerary_response_options,
+            selectinload(ItineraryModel.activities)
+        ).where(ItineraryModel.id == itinerary_id)
+    )
+    itinerary = result.scalars().first()
     
     if not itinerary:
         raise HTTPException(
@@ -93,11 +139,11 @@ async def get_itinerary(
 async def update_itinerary(
     itinerary_id: str,
     itinerary_update: ItineraryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update itinerary"""
-    itinerary = db.query(ItineraryModel).filter(ItineraryModel.id == itinerary_id).first()
+    itinerary = await db.get(ItineraryModel, itinerary_id)
     
     if not itinerary:
         raise HTTPException(
@@ -115,26 +161,26 @@ async def update_itinerary(
     for field, value in update_data.items():
         setattr(itinerary, field, value)
     
-    db.commit()
-    db.refresh(itinerary)
+    await db.commit()
     
     # Load relationships for response
-    itinerary = db.query(ItineraryModel).options(
-        joinedload(ItineraryModel.owner),
-        joinedload(ItineraryModel.collaborators)
-    ).filter(ItineraryModel.id == itinerary_id).first()
+    result = await db.execute(
+        select(ItineraryModel).options(*itinerary_response_options)
+        .where(ItineraryModel.id == itinerary_id)
+        .execution_options(populate_existing=True)
+    )
     
-    return itinerary
+    return result.scalars().first()
 
 
 @router.delete("/{itinerary_id}")
 async def delete_itinerary(
     itinerary_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Delete itinerary"""
-    itinerary = db.query(ItineraryModel).filter(ItineraryModel.id == itinerary_id).first()
+    itinerary = await db.get(ItineraryModel, itinerary_id)
     
     if not itinerary:
         raise HTTPException(
@@ -148,8 +194,8 @@ async def delete_itinerary(
             detail="Not authorized to delete this itinerary"
         )
     
-    db.delete(itinerary)
-    db.commit()
+    await db.delete(itinerary)
+    await db.commit()
     
     return {"message": "Itinerary deleted successfully"}
 
@@ -158,35 +204,37 @@ async def delete_itinerary(
 @router.get("/{itinerary_id}/activities", response_model=List[Activity])
 async def get_itinerary_activities(
     itinerary_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get activities for an itinerary"""
     # First check if user has access to itinerary
-    itinerary = db.query(ItineraryModel).filter(ItineraryModel.id == itinerary_id).first()
+    itinerary = await db.get(ItineraryModel, itinerary_id)
     if not itinerary:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Itinerary not found"
         )
     
-    activities = db.query(ActivityModel).filter(
-        ActivityModel.itinerary_id == itinerary_id
-    ).order_by(ActivityModel.start_time).all()
+    result = await db.execute(
+        select(ActivityModel).where(
+            ActivityModel.itinerary_id == itinerary_id
+        ).order_by(ActivityModel.start_time)
+    )
     
-    return activities
+    return result.scalars().all()
 
 
 @router.post("/{itinerary_id}/activities", response_model=Activity, status_code=status.HTTP_201_CREATED)
 async def create_activity(
     itinerary_id: str,
     activity_data: ActivityCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Create a new activity in an itinerary"""
     # Check if itinerary exists and user has access
-    itinerary = db.query(ItineraryModel).filter(ItineraryModel.id == itinerary_id).first()
+    itinerary = await db.get(ItineraryModel, itinerary_id)
     if not itinerary:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -199,8 +247,8 @@ async def create_activity(
     db_activity = ActivityModel(**activity_dict)
     
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await db.commit()
+    await db.refresh(db_activity)
     
     return db_activity
 
@@ -210,14 +258,17 @@ async def update_activity(
     itinerary_id: str,
     activity_id: str,
     activity_update: ActivityUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update an activity"""
-    activity = db.query(ActivityModel).filter(
-        ActivityModel.id == activity_id,
-        ActivityModel.itinerary_id == itinerary_id
-    ).first()
+    result = await db.execute(
+        select(ActivityModel).where(
+            ActivityModel.id == activity_id,
+            ActivityModel.itinerary_id == itinerary_id
+        )
+    )
+    activity = result.scalars().first()
     
     if not activity:
         raise HTTPException(
@@ -229,8 +280,8 @@ async def update_activity(
     for field, value in update_data.items():
         setattr(activity, field, value)
     
-    db.commit()
-    db.refresh(activity)
+    await db.commit()
+    await db.refresh(activity)
     
     return activity
 
@@ -239,14 +290,17 @@ async def update_activity(
 async def delete_activity(
     itinerary_id: str,
     activity_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Delete an activity"""
-    activity = db.query(ActivityModel).filter(
-        ActivityModel.id == activity_id,
-        ActivityModel.itinerary_id == itinerary_id
-    ).first()
+    result = await db.execute(
+        select(ActivityModel).where(
+            ActivityModel.id == activity_id,
+            ActivityModel.itinerary_id == itinerary_id
+        )
+    )
+    activity = result.scalars().first()
     
     if not activity:
         raise HTTPException(
@@ -254,7 +308,7 @@ async def delete_activity(
             detail="Activity not found"
         )
     
-    db.delete(activity)
-    db.commit()
+    await db.delete(activity)
+    await db.commit()
     
     return {"message": "Activity deleted successfully"}
@@ -1,26 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-import googlemaps
-import httpx
+from typing import List, Dict, Any, Optional
+import asyncio
 from datetime import datetime
 
 from database import get_db
 from models import User as UserModel
 from schemas import Location
 from api.auth import get_current_active_user
+from services import PlacesClient, HttpClients, HttpProvider, PlaceTileCache
 from config import settings
 
 router = APIRouter()
 
-# Initialize Google Maps client (only if API key is provided)
-gmaps = None
-if settings.google_maps_api_key and settings.google_maps_api_key != "your_google_maps_api_key_here":
-    try:
-        gmaps = googlemaps.Client(key=settings.google_maps_api_key)
-    except Exception as e:
-        print(f"Warning: Could not initialize Google Maps client: {e}")
-        gmaps = None
+# One pooled HTTP client per external API, opened and closed by the app lifespan
+http_clients = HttpClients(
+    [
+        HttpProvider(
+            "places",
+            base_url="https://maps.googleapis.com",
+            max_connections=settings.places_max_connections,
+            timeout=settings.places_timeout
+        ),
+        HttpProvider(
+            "weather",
+            base_url="https://api.openweathermap.org",
+            max_connections=settings.weather_max_connections,
+            timeout=settings.weather_timeout
+        ),
+    ],
+    http2=settings.http2_enabled,
+    keepalive_expiry=settings.http_keepalive_expiry
+)
+
+# Google Places client, set up on startup (only if API key is provided)
+places_client: Optional[PlacesClient] = None
+
+
+def start_http_clients():
+    """Open the provider connection pools and the clients built on them"""
+    global places_client
+    http_clients.start()
+    if settings.google_maps_api_key and settings.google_maps_api_key != "your_google_maps_api_key_here":
+        places_client = PlacesClient(settings.google_maps_api_key, http_clients.get("places"))
+
+
+async def stop_http_clients():
+    """Close the provider connection pools"""
+    global places_client
+    places_client = None
+    await http_clients.aclose()
 
 
 class RecommendationService:
@@ -30,60 +59,65 @@ class RecommendationService:
     async def get_weather_info(lat: float, lng: float) -> Dict[str, Any]:
         """Get weather information for a location"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"https://api.openweathermap.org/data/2.5/weather",
-                    params={
-                        "lat": lat,
-                        "lon": lng,
-                        "appid": settings.openweather_api_key,
-                        "units": "metric"
-                    }
-                )
-                if response.status_code == 200:
-                    return response.json()
-                return {}
+            response = await http_clients.get("weather").get(
+                "/data/2.5/weather",
+                params={
+                    "lat": lat,
+                    "lon": lng,
+                    "appid": settings.openweather_api_key,
+                    "units": "metric"
+                }
+            )
+            if response.status_code == 200:
+                return response.json()
+            return {}
         except Exception:
             return {}
     
     @staticmethod
-    def get_nearby_places(lat: float, lng: float, place_type: str = "tourist_attraction", radius: int = 5000) -> List[Dict]:
-        """Get nearby places using Google Places API"""
-        if gmaps is None:
+    async def get_nearby_places(lat: float, lng: float, place_type: str = "tourist_attraction", radius: int = 5000) -> List[Dict]:
+        """Get nearby places, served from the place tile cache where possible"""
+        if places_client is None:
             return []
         try:
-            places_result = gmaps.places_nearby(
-                location=(lat, lng),
-                radius=radius,
-                type=place_type
-            )
-            
-            places = []
-            for place in places_result.get('results', [])[:10]:  # Limit to 10 results
-                place_details = {
-                    "place_id": place.get("place_id"),
-                    "name": place.get("name"),
-                    "rating": place.get("rating"),
-                    "price_level": place.get("price_level"),
-                    "types": place.get("types", []),
-                    "vicinity": place.get("vicinity"),
-                    "geometry": place.get("geometry", {}).get("location", {}),
-                    "photos": [photo.get("photo_reference") for photo in place.get("photos", [])[:3]]
-                }
-                places.append(place_details)
-            
-            return places
+            places = await nearby_place_tiles.search(lat, lng, place_type, radius)
+            return places[:10]  # Limit to 10 results
         except Exception as e:
             print(f"Error getting nearby places: {e}")
             return []
     
+    @staticmethod
+    async def fetch_nearby_places(lat: float, lng: float, place_type: str, radius: int) -> List[Dict]:
+        """Get nearby places from the Google Places API"""
+        places_result = await places_client.places_nearby(
+            location=(lat, lng),
+            radius=radius,
+            type=place_type
+        )
+        
+        places = []
+        for place in places_result.get('results', []):
+            place_details = {
+                "place_id": place.get("place_id"),
+                "name": place.get("name"),
+                "rating": place.get("rating"),
+                "price_level": place.get("price_level"),
+                "types": place.get("types", []),
+                "vicinity": place.get("vicinity"),
+                "geometry": place.get("geometry", {}).get("location", {}),
+                "photos": [photo.get("photo_reference") for photo in place.get("photos", [])[:3]]
+            }
+            places.append(place_details)
+        
+        return places
+    
     @staticmethod
     async def get_place_details(place_id: str) -> Dict[str, Any]:
         """Get detailed information about a place"""
-        if gmaps is None:
+        if places_client is None:
             return {}
         try:
-            place_details = gmaps.place(
+            place_details = await places_client.place(
                 place_id=place_id,
                 fields=[
                     "name", "formatted_address", "international_phone_number",
@@ -97,6 +131,14 @@ class RecommendationService:
             return {}
 
 
+# Nearby results per geohash tile, shared by every user searching the same area
+nearby_place_tiles = PlaceTileCache(
+    RecommendationService.fetch_nearby_places,
+    maxsize=settings.places_tile_cache_size,
+    ttl=settings.places_tile_ttl
+)
+
+
 @router.get("/places/nearby")
 async def get_nearby_recommendations(
     lat: float,
@@ -106,8 +148,10 @@ async def get_nearby_recommendations(
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get nearby place recommendations"""
-    places = RecommendationService.get_nearby_places(lat, lng, place_type, radius)
-    weather = await RecommendationService.get_weather_info(lat, lng)
+    places, weather = await asyncio.gather(
+        RecommendationService.get_nearby_places(lat, lng, place_type, radius),
+        RecommendationService.get_weather_info(lat, lng)
+    )
     
     return {
         "places": places,
@@ -148,7 +192,7 @@ async def get_restaurant_recommendations(
 ):
     """Get restaurant recommendations"""
     # Base search for restaurants
-    restaurants = RecommendationService.get_nearby_places(lat, lng, "restaurant", radius)
+    restaurants = await RecommendationService.get_nearby_places(lat, lng, "restaurant", radius)
     
     # Filter by cuisine or price level if specified
     if cuisine:
@@ -192,7 +236,7 @@ async def get_activity_recommendations(
     }
     
     google_type = activity_types.get(activity_type, activity_type)
-    activities = RecommendationService.get_nearby_places(lat, lng, google_type)
+    activities = await RecommendationService.get_nearby_places(lat, lng, google_type)
     
     return {
         "activities": activities,
@@ -251,21 +295,27 @@ async def get_personalized_recommendations(
     
     recommendations = []
     
+    # One place type per interest to limit API calls; interests sharing a type share the lookup
+    place_types = [interest_mapping.get(interest.lower(), ["tourist_attraction"])[0] for interest in interests]
+    unique_types = list(dict.fromkeys(place_types))
+    results = await asyncio.gather(
+        *(RecommendationService.get_nearby_places(lat, lng, place_type) for place_type in unique_types)
+    )
+    places_by_type = dict(zip(unique_types, results))
+    
     # Get recommendations for each interest
-    for interest in interests:
-        place_types = interest_mapping.get(interest.lower(), ["tourist_attraction"])
-        for place_type in place_types[:1]:  # Limit to avoid too many API calls
-            places = RecommendationService.get_nearby_places(lat, lng, place_type)
-            
-            # Filter by budget if price level is available
-            if budget in budget_mapping:
-                allowed_prices = budget_mapping[budget]
-                places = [
-                    p for p in places 
-                    if p.get("price_level") is None or p.get("price_level") in allowed_prices
-                ]
-            
-            recommendations.extend(places[:5])  # Limit per category
+    for place_type in place_types:
+        places = places_by_type[place_type]
+        
+        # Filter by budget if price level is available
+        if budget in budget_mapping:
+            allowed_prices = budget_mapping[budget]
+            places = [
+                p for p in places 
+                if p.get("price_level") is None or p.get("price_level") in allowed_prices
+            ]
+        
+        recommendations.extend(places[:5])  # Limit per category
     
     # Remove duplicates and sort by rating
     unique_recommendations = []
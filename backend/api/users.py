@@ -1,35 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
 from database import get_db
 from models import User as UserModel
-from schemas import User, UserUpdate
-from api.auth import get_current_active_user
+from schemas import User, UserUpdate, UserPage
+from api.auth import get_current_active_user, user_cache
+from services import search_users as search_users_index, keyset_paginate, split_page, InvalidCursorError
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[User])
+@router.get("/", response_model=UserPage)
 async def get_users(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get list of users (for collaboration features)"""
-    users = db.query(UserModel).filter(UserModel.is_active == True).offset(skip).limit(limit).all()
-    return users
+    try:
+        stmt = keyset_paginate(
+            select(UserModel).where(UserModel.is_active == True),
+            UserModel.created_at, UserModel.id,
+            cursor, limit, db.bind.dialect.name, descending=False
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    result = await db.execute(stmt)
+    users, next_cursor = split_page(result.scalars().all(), limit, lambda u: (u.created_at, u.id))
+    return {"items": users, "next_cursor": next_cursor}
 
 
 @router.get("/{user_id}", response_model=User)
 async def get_user(
     user_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get user by ID"""
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await db.get(UserModel, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -41,41 +53,41 @@ async def get_user(
 @router.put("/me", response_model=User)
 async def update_current_user(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update current user information"""
     update_data = user_update.dict(exclude_unset=True)
     
+    # current_user may be a detached cached instance; modify this session's row
+    user = await db.get(UserModel, current_user.id)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    await db.commit()
+    await db.refresh(user)
+    user_cache.invalidate(user.username)
+    return user
 
 
 @router.delete("/me")
 async def delete_current_user(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Deactivate current user account"""
-    current_user.is_active = False
-    db.commit()
+    user = await db.get(UserModel, current_user.id)
+    user.is_active = False
+    await db.commit()
+    user_cache.invalidate(user.username)
     return {"message": "Account deactivated successfully"}
 
 
 @router.get("/search/{query}", response_model=List[User])
 async def search_users(
     query: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Search users by username or full name"""
-    users = db.query(UserModel).filter(
-        (UserModel.username.ilike(f"%{query}%")) |
-        (UserModel.full_name.ilike(f"%{query}%"))
-    ).filter(UserModel.is_active == True).limit(10).all()
-    
-    return users
+    return await search_users_index(db, query, limit=10)
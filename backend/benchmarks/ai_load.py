@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Load test for the AI endpoints of the BARABULA API.
+
+Drives /chat/message, /chat/message/stream, /chat/generate-itinerary (3- and
+14-day trips), /chat/translate and /chat/translate/batch with CONCURRENCY
+requests in flight, and reports throughput and p50/p95/p99 latency per
+endpoint (plus time to first event for streaming endpoints). Payloads are
+unique per request so every call reaches the model; pass --repeat to send the
+same payload each time and measure the caches instead. Run it against a
+server pointed at benchmarks/fake_openai.py to measure capacity offline:
+
+    python benchmarks/fake_openai.py --port 8100 --latency-ms 800 --token-ms 10
+    OPENAI_BASE_URL=http://localhost:8100/v1 uvicorn main:app --workers 1
+    python benchmarks/ai_load.py --concurrency 20 --requests 200
+    python benchmarks/ai_load.py --endpoints chat chat_stream --requests 500
+
+When the fake server's /stats endpoint is reachable (--openai-stats-url), the
+number of upstream calls per request is reported too.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import get_token, summarize, print_report  # noqa: E402
+
+BASE_URL = os.environ.get("BENCH_BASE_URL", "http://localhost:8000")
+
+CITIES = ["Lisbon", "Kyoto", "Mexico City", "Istanbul", "Cape Town", "Reykjavik", "Hanoi", "Buenos Aires"]
+
+PHRASES = [
+    "Breakfast at a local bakery near the hotel",
+    "Guided walking tour of the old town",
+    "Visit the modern art museum; closed on Mondays",
+    "Sunset viewpoint, bring a light jacket",
+]
+
+
+def itinerary_request(n: int, tag: str, days: int) -> Dict[str, Any]:
+    return {
+        "destination": f"{CITIES[n % len(CITIES)]}{tag}",
+        "start_date": "2026-06-01T00:00:00",
+        "end_date": f"2026-06-{1 + days:02d}T00:00:00",
+        "interests": ["food", "history"],
+        "travel_style": "moderate",
+        "group_size": 2,
+    }
+
+
+# name -> (label, streaming, request builder taking (request number, uniqueness tag))
+SCENARIOS: Dict[str, tuple] = {
+    "chat": ("POST /chat/message", False, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/message",
+        "json": {"message": f"What should I see in {CITIES[n % len(CITIES)]}?{tag}"},
+    }),
+    "chat_stream": ("POST /chat/message/stream", True, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/message/stream",
+        "json": {"message": f"Where should I eat in {CITIES[n % len(CITIES)]}?{tag}"},
+    }),
+    "itinerary": ("POST /chat/generate-itinerary (3d)", False, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/generate-itinerary", "json": itinerary_request(n, tag, 3),
+    }),
+    "itinerary_long": ("POST /chat/generate-itinerary (14d)", False, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/generate-itinerary", "json": itinerary_request(n, tag, 14),
+    }),
+    "itinerary_stream": ("POST /chat/generate-itinerary/stream", True, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/generate-itinerary/stream", "json": itinerary_request(n, tag, 3),
+    }),
+    "translate": ("POST /chat/translate", False, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/translate",
+        "params": {"text": f"{PHRASES[n % len(PHRASES)]}{tag}", "target_language": "French"},
+    }),
+    "translate_batch": ("POST /chat/translate/batch (20)", False, lambda n, tag: {
+        "method": "POST", "url": "/api/v1/chat/translate/batch",
+        "json": {"texts": [f"{PHRASES[i % len(PHRASES)]} ({i}){tag}" for i in range(20)], "target_language": "French"},
+    }),
+}
+
+
+async def openai_calls(stats_url: Optional[str]) -> Optional[int]:
+    """Upstream call count from the fake OpenAI server, if it is reachable"""
+    if not stats_url:
+        return None
+    try:
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(stats_url)
+            return response.json()["calls"]
+    except (httpx.HTTPError, ValueError, KeyError):
+        return None
+
+
+async def run_scenario(client: httpx.AsyncClient, build: Callable, streaming: bool, tokens: List[str],
+                       total: int, concurrency: int, repeat: bool):
+    """Issue total requests with at most concurrency in flight"""
+    latencies = []
+    first_event = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    run_id = uuid.uuid4().hex[:6]
+
+    async def one(n: int):
+        nonlocal errors
+        request = build(n, "" if repeat else f" [{run_id}-{n}]")
+        headers = {"Authorization": f"Bearer {tokens[n % len(tokens)]}"}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if streaming:
+                    async with client.stream(headers=headers, **request) as response:
+                        if response.status_code >= 400:
+                            errors += 1
+                            return
+                        first = None
+                        async for line in response.aiter_lines():
+                            if first is None and line.startswith(("data:", "event:")):
+                                first = time.perf_counter() - start
+                            if line.startswith("event: error"):
+                                errors += 1
+                                return
+                        first_event.append(first if first is not None else time.perf_counter() - start)
+                else:
+                    response = await client.request(headers=headers, **request)
+                    if response.status_code >= 400:
+                        errors += 1
+                        return
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(total)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors), (summarize(first_event, elapsed) if streaming else None)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--users", type=int, default=10, help="users the requests are spread across")
+    parser.add_argument("--repeat", action="store_true", help="send identical payloads (measures the caches)")
+    parser.add_argument("--openai-stats-url", default="http://localhost:8100/stats",
+                        help="fake OpenAI server stats, for upstream calls per request ('' to skip)")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=300) as client:
+        tokens = [await get_token(client) for _ in range(args.users)]
+        print(f"Load testing {BASE_URL} with concurrency={args.concurrency}, {args.users} users"
+              f"{', repeated payloads' if args.repeat else ''}")
+        for name in args.endpoints:
+            label, streaming, build = SCENARIOS[name]
+            calls_before = await openai_calls(args.openai_stats_url)
+            summary, first_event = await run_scenario(
+                client, build, streaming, tokens, args.requests, args.concurrency, args.repeat
+            )
+            print_report(label, summary)
+            if first_event:
+                print_report("  first event", first_event)
+            calls_after = await openai_calls(args.openai_stats_url)
+            if calls_before is not None and calls_after is not None:
+                print(f"  {(calls_after - calls_before) / args.requests:.2f} OpenAI calls per request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""
+Shared helpers for BARABULA benchmark scripts
+"""
+import statistics
+import uuid
+from typing import Dict, List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of samples using nearest-rank"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Summarize request latencies (seconds) collected over elapsed wall-clock seconds"""
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": count / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def print_report(name: str, summary: Dict[str, float]):
+    """Print a one-line benchmark summary"""
+    print(
+        f"{name:<40} {summary['requests']:>7} req  {summary['errors']:>5} err  "
+        f"{summary['throughput_rps']:>9.1f} req/s  "
+        f"p50 {summary['p50_ms']:>8.1f}ms  p95 {summary['p95_ms']:>8.1f}ms  p99 {summary['p99_ms']:>8.1f}ms"
+    )
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    """Register a throwaway user and return a bearer token"""
+    suffix = uuid.uuid4().hex[:8]
+    password = "benchpassword123"
+    await client.post("/api/v1/auth/register", json={
+        "username": f"bench_{suffix}",
+        "email": f"bench_{suffix}@example.com",
+        "password": password,
+        "full_name": "Benchmark User",
+    })
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": f"bench_{suffix}", "password": password},
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
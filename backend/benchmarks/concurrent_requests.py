@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Concurrent-request throughput benchmark for the BARABULA API.
+
+Fires CONCURRENCY simultaneous authenticated requests at database-backed
+endpoints and reports throughput and latency percentiles. Run it once against
+a server built from the synchronous-session code and once against the
+AsyncSession build to compare how well a single worker overlaps DB round trips:
+
+    uvicorn main:app --workers 1
+    python benchmarks/concurrent_requests.py --concurrency 50 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import get_token, summarize, print_report  # noqa: E402
+
+BASE_URL = os.environ.get("BENCH_BASE_URL", "http://localhost:8000")
+
+ENDPOINTS = [
+    "/api/v1/auth/me",
+    "/api/v1/users/",
+    "/api/v1/itineraries/",
+    "/api/v1/chat/history",
+]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, headers: dict, total: int, concurrency: int):
+    """Issue total requests to path with at most concurrency in flight"""
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+                    return
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint")
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=BASE_URL, limits=limits, timeout=60) as client:
+        headers = {"Authorization": f"Bearer {await get_token(client)}"}
+        print(f"Benchmarking {BASE_URL} with concurrency={args.concurrency}")
+        for path in ENDPOINTS:
+            summary = await run_endpoint(client, path, headers, args.requests, args.concurrency)
+            print_report(f"GET {path}", summary)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat-completions API, for load tests.
+
+Serves POST /v1/chat/completions, with or without ``stream`` and
+``response_format={"type": "json_object"}``, and answers with content shaped
+like what each BARABULA prompt expects: chat replies, translations,
+translation batches, itinerary outlines and day-by-day itineraries. Replies
+respect ``max_tokens`` (finish_reason "length"), so long trips truncate the
+same way they do against the real API.
+
+Each call waits a time-to-first-token drawn from --latency-dist around
+--latency-ms, then --token-ms per output token (between chunks when
+streaming). --error-rate answers 500 and --rate-limit-rate answers 429 with a
+Retry-After header. GET /stats reports call counts since the last
+POST /stats/reset.
+
+    python benchmarks/fake_openai.py --port 8100 --latency-ms 800 --token-ms 10
+    OPENAI_BASE_URL=http://localhost:8100/v1 uvicorn main:app --workers 1
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List
+
+CHARS_PER_TOKEN = 4
+
+CHAT_SENTENCES = [
+    "The old town is best explored on foot early in the morning, before the tour groups arrive.",
+    "Most museums close one day a week, so check opening hours before you plan the day around them.",
+    "Local markets are a good place for an inexpensive lunch and a feel for everyday life.",
+    "Public transport passes usually pay for themselves after three or four rides a day.",
+    "Book popular restaurants a few days ahead, especially for Friday and Saturday evenings.",
+    "Sunset viewpoints get crowded, so arrive half an hour early for a good spot.",
+]
+
+ACTIVITY_CATEGORIES = ["attraction", "restaurant", "attraction", "transport"]
+
+
+def sample_latency(dist: str, mean: float, spread: float) -> float:
+    """Draw a latency (seconds) with the given mean; spread is the relative width"""
+    if mean <= 0 or dist == "fixed":
+        return max(mean, 0.0)
+    if dist == "uniform":
+        return random.uniform(mean * (1 - spread), mean * (1 + spread))
+    if dist == "normal":
+        return max(0.0, random.gauss(mean, mean * spread))
+    if dist == "exponential":
+        return random.expovariate(1 / mean)
+    # lognormal with the requested mean; spread is sigma of the underlying normal
+    return random.lognormvariate(math.log(mean) - spread ** 2 / 2, spread)
+
+
+def count_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def make_activities(day: int, per_day: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": f"Day {day} stop {index + 1}",
+            "description": "A well-reviewed spot that fits the day's theme, with time to look around.",
+            "category": ACTIVITY_CATEGORIES[index % len(ACTIVITY_CATEGORIES)],
+            "start_time": f"{9 + index * 3:02d}:00",
+            "duration_minutes": 120,
+            "estimated_cost": 20 + 5 * index,
+            "location": {"address": f"{index + 1} Example Street", "latitude": 0.0, "longitude": 0.0},
+            "notes": "Arrive early to avoid queues.",
+        }
+        for index in range(per_day)
+    ]
+
+
+def make_days(first_day: int, last_day: int, per_day: int) -> List[Dict[str, Any]]:
+    return [
+        {"day": day, "date": "", "activities": make_activities(day, per_day)}
+        for day in range(first_day, last_day + 1)
+    ]
+
+
+def json_reply(prompt: str, args) -> Dict[str, Any]:
+    """JSON object for a json_object request, shaped after the prompt that asked for it"""
+    try:
+        texts = json.loads(prompt)
+    except json.JSONDecodeError:
+        texts = None
+    if isinstance(texts, dict):
+        return {"translations": {key: f"[translated] {text}" for key, text in texts.items()}}
+
+    match = re.search(r"Plan days (\d+) to (\d+)", prompt)
+    if match:
+        return {"daily_activities": make_days(int(match.group(1)), int(match.group(2)), args.activities_per_day)}
+
+    match = re.search(r"(\d+)-day", prompt)
+    duration = max(int(match.group(1)), 1) if match else 3
+    if prompt.startswith("Outline"):
+        return {
+            "title": f"{duration}-day trip",
+            "description": "A balanced mix of sights, food and free time.",
+            "days": [
+                {"day": day, "theme": "Highlights", "area": f"District {day}", "highlights": [f"Sight {day}"]}
+                for day in range(1, duration + 1)
+            ],
+            "estimated_total_cost": 150 * duration,
+            "recommendations": ["Buy a transit pass", "Book popular restaurants ahead"],
+        }
+    return {
+        "title": f"{duration}-day trip",
+        "description": "A balanced mix of sights, food and free time.",
+        "daily_activities": make_days(1, duration, args.activities_per_day),
+        "estimated_total_cost": 150 * duration,
+        "recommendations": ["Buy a transit pass", "Book popular restaurants ahead"],
+    }
+
+
+def reply_content(body: Dict[str, Any], args) -> str:
+    messages = body.get("messages") or [{"content": ""}]
+    prompt = messages[-1].get("content") or ""
+    system = (messages[0].get("content") or "") if len(messages) > 1 else ""
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        return json.dumps(json_reply(prompt, args))
+    if "translator" in system.lower():
+        return f"[translated] {prompt}"
+    words = []
+    while len(words) < args.chat_words:
+        words.extend(random.choice(CHAT_SENTENCES).split())
+    return " ".join(words[:args.chat_words])
+
+
+def create_app(args):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    app = FastAPI(title="Fake OpenAI")
+    stats = {"calls": 0, "streamed": 0, "errors": 0, "rate_limited": 0, "in_flight": 0, "max_in_flight": 0,
+             "prompt_tokens": 0, "completion_tokens": 0}
+
+    def error(status_code: int, message: str, error_type: str, headers: Dict[str, str] = None):
+        return JSONResponse(
+            {"error": {"message": message, "type": error_type, "param": None, "code": None}},
+            status_code=status_code,
+            headers=headers,
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["calls"] += 1
+        roll = random.random()
+        if roll < args.rate_limit_rate:
+            stats["rate_limited"] += 1
+            return error(429, "Rate limit reached (fake)", "requests", {"retry-after": str(args.retry_after)})
+        if roll < args.rate_limit_rate + args.error_rate:
+            stats["errors"] += 1
+            return error(500, "The server had an error (fake)", "server_error")
+
+        model = body.get("model", "gpt-4")
+        content = reply_content(body, args)
+        finish_reason = "stop"
+        max_tokens = body.get("max_tokens")
+        if max_tokens and count_tokens(content) > max_tokens:
+            content = content[:max_tokens * CHARS_PER_TOKEN]
+            finish_reason = "length"
+        prompt_tokens = sum(count_tokens(message.get("content") or "") + 4 for message in body.get("messages", [])) + 3
+        completion_tokens = count_tokens(content)
+        stats["prompt_tokens"] += prompt_tokens
+        stats["completion_tokens"] += completion_tokens
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        first_token = sample_latency(args.latency_dist, args.latency_ms / 1000, args.latency_spread)
+        per_token = args.token_ms / 1000
+
+        if body.get("stream"):
+            stats["streamed"] += 1
+
+            def chunk(delta: Dict[str, Any], reason: str = None) -> str:
+                return "data: " + json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": reason}],
+                }) + "\n\n"
+
+            async def events():
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+                try:
+                    await asyncio.sleep(first_token)
+                    yield chunk({"role": "assistant", "content": ""})
+                    # One chunk per --stream-tokens tokens, paced at --token-ms per token
+                    step = args.stream_tokens * CHARS_PER_TOKEN
+                    for start in range(0, len(content), step):
+                        if per_token:
+                            await asyncio.sleep(per_token * args.stream_tokens)
+                        yield chunk({"content": content[start:start + step]})
+                    yield chunk({}, finish_reason)
+                    yield "data: [DONE]\n\n"
+                finally:
+                    stats["in_flight"] -= 1
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(first_token + per_token * completion_tokens)
+        finally:
+            stats["in_flight"] -= 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        for key in stats:
+            if key != "in_flight":
+                stats[key] = 0
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800, help="mean time to first token")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "normal", "lognormal", "exponential"],
+                        default="lognormal")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="relative width (uniform, normal) or sigma (lognormal)")
+    parser.add_argument("--token-ms", type=float, default=10, help="milliseconds per output token")
+    parser.add_argument("--stream-tokens", type=int, default=4, help="output tokens per streamed chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--chat-words", type=int, default=120, help="words per chat reply")
+    parser.add_argument("--activities-per-day", type=int, default=4)
+    parser.add_argument("--seed", type=int, help="random seed for reproducible runs")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Translation throughput benchmark: one call per string vs batched calls.
+
+Translates --batches batches of --strings itinerary-style strings through
+AIService, first one /translate-style call per string, then with
+translate_batch (cold translation memory), then translate_batch again with
+the memory warm. By default OpenAI is replaced by a fake client that sleeps
+--latency seconds plus --per-token seconds per output token; pass --live to
+use the configured OPENAI_API_KEY instead:
+
+    python benchmarks/translation_batch.py --strings 100 --batches 5
+    python benchmarks/translation_batch.py --strings 100 --batches 1 --live
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PHRASES = [
+    "Breakfast at a local bakery near the hotel",
+    "Guided walking tour of the old town",
+    "Visit the modern art museum; closed on Mondays",
+    "Lunch at the covered market, try the grilled fish",
+    "Sunset viewpoint, bring a light jacket",
+    "Take the metro line 2 to the waterfront",
+    "Dinner reservation at 8pm, smart casual dress code",
+    "Free afternoon for shopping or a nap",
+]
+
+
+class FakeCompletions:
+    """Stand-in for client.chat.completions with a simple latency model"""
+
+    def __init__(self, latency: float, per_token: float):
+        self.latency = latency
+        self.per_token = per_token
+
+    async def create(self, messages, response_format=None, **kwargs):
+        content = messages[-1]["content"]
+        if response_format:
+            texts = json.loads(content)
+            output = json.dumps({"translations": {key: f"[fr] {text}" for key, text in texts.items()}})
+        else:
+            output = f"[fr] {content}"
+        await asyncio.sleep(self.latency + self.per_token * len(output) / 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=output))])
+
+
+def make_batches(args):
+    return [
+        [f"{PHRASES[i % len(PHRASES)]} (day {batch + 1}, item {i + 1})" for i in range(args.strings)]
+        for batch in range(args.batches)
+    ]
+
+
+async def run(args):
+    from api import chat
+
+    if not args.live:
+        fake = FakeCompletions(args.latency, args.per_token)
+        chat.client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+    batches = make_batches(args)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def translate_one(text):
+        async with semaphore:
+            return await chat.AIService.translate_text(text, "French")
+
+    async def per_string(texts):
+        return await asyncio.gather(*(translate_one(text) for text in texts))
+
+    async def batch(texts):
+        return (await chat.AIService.translate_batch(texts, "French"))[0]
+
+    for name, translate, clear_memory in (
+        (f"per-string (concurrency {args.concurrency})", per_string, True),
+        ("batch, cold memory", batch, True),
+        ("batch, warm memory", batch, False),
+    ):
+        if clear_memory:
+            chat.translation_memory.clear()
+        calls_before = chat.translation_llm_calls.value
+        elapsed = 0.0
+        for texts in batches:
+            start = time.perf_counter()
+            translations = await translate(texts)
+            elapsed += time.perf_counter() - start
+            assert len(translations) == len(texts)
+        strings = args.strings * len(batches)
+        calls = chat.translation_llm_calls.value - calls_before
+        print(f"{name:<32} {strings:>6} strings  {calls:>5} calls  "
+              f"{elapsed / len(batches) * 1000:8.1f}ms/batch  {strings / elapsed:9.1f} strings/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strings", type=int, default=100, help="strings per batch")
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel calls in per-string mode")
+    parser.add_argument("--latency", type=float, default=0.4, help="fake call latency in seconds")
+    parser.add_argument("--per-token", type=float, default=0.002, help="fake seconds per output token")
+    parser.add_argument("--live", action="store_true", help="call the real OpenAI API")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
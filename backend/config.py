@@ -11,14 +11,105 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800  # seconds; recycle before server-side idle timeouts
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
     
     # Security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    password_hash_workers: int = 4  # concurrent bcrypt operations
+    password_hash_max_queue: int = 64  # waiting operations before shedding with 503
+    auth_user_cache_size: int = 1024
+    auth_user_cache_ttl: int = 60  # seconds; bounds staleness across worker processes
     
     # OpenAI Configuration
     openai_api_key: str = "your_openai_api_key_here"
+    openai_base_url: str = ""  # e.g. http://localhost:8100/v1 for benchmarks/fake_openai.py; empty uses api.openai.com
+    
+    # Chat response cache
+    chat_cache_size: int = 2048
+    chat_cache_ttl: int = 3600  # seconds
+    chat_cache_max_entry_chars: int = 8000
+    
+    # Generated itinerary cache
+    itinerary_cache_size: int = 256
+    itinerary_cache_ttl: int = 21600  # seconds
+    
+    # OpenAI admission control
+    openai_max_concurrency: int = 16
+    openai_tokens_per_minute: int = 90000  # 0 disables token budgeting
+    openai_max_retries: int = 4
+    openai_backoff_base: float = 0.5  # seconds
+    openai_backoff_max: float = 20.0  # seconds
+    
+    # Model routing per request class (empty fallback disables falling back; SLO 0 disables the latency check)
+    model_chat: str = "gpt-4"
+    model_chat_fallback: str = "gpt-3.5-turbo"
+    model_chat_slo_p95: float = 10.0  # seconds
+    model_itinerary: str = "gpt-4"
+    model_itinerary_fallback: str = "gpt-3.5-turbo"
+    model_itinerary_slo_p95: float = 60.0  # seconds
+    model_translate: str = "gpt-3.5-turbo"
+    model_translate_fallback: str = ""
+    model_translate_slo_p95: float = 0.0  # seconds
+    model_summary: str = "gpt-3.5-turbo"
+    model_summary_fallback: str = ""
+    model_summary_slo_p95: float = 0.0  # seconds
+    model_route_window_size: int = 200  # most recent calls per class and model
+    model_route_window_seconds: float = 300.0
+    model_route_min_samples: int = 20
+    model_route_max_error_rate: float = 0.25
+    model_route_probe_ratio: float = 0.05  # share of degraded traffic still sent to the primary
+    
+    # Prompt section token budgets
+    prompt_preferences_token_budget: int = 300
+    prompt_context_token_budget: int = 500
+    prompt_interests_token_budget: int = 100
+    prompt_requirements_token_budget: int = 200
+    prompt_summary_token_budget: int = 300
+    
+    # Conversation memory (recent turns verbatim plus a rolling summary)
+    chat_memory_turns: int = 6
+    chat_memory_summary_words: int = 150
+    chat_memory_cache_size: int = 4096
+    chat_memory_ttl: int = 1800  # seconds
+    
+    # Translation memory and batching
+    translation_memory_size: int = 20000
+    translation_memory_ttl: int = 604800  # seconds
+    translation_batch_size: int = 40  # strings per OpenAI call
+    translation_chunk_tokens: int = 1500  # source tokens per OpenAI call; the reply needs about twice that
+    translation_fallback_concurrency: int = 4  # strings a batch left out, retried one call each
+    
+    # Background itinerary generation jobs
+    itinerary_job_workers: int = 4
+    itinerary_job_max_queue: int = 200
+    itinerary_job_lease_seconds: float = 60.0  # running jobs without a heartbeat this long are reclaimed
+    
+    # Long trips are outlined first, then generated as day ranges in parallel
+    itinerary_chunk_days: int = 4  # days per OpenAI call; 0 generates every trip in one call
+    
+    # Chat history write-behind buffer
+    chat_history_batch_size: int = 100
+    chat_history_flush_interval: float = 0.5  # seconds
+    chat_history_max_buffer: int = 10000  # buffered records before add() drops new ones
+    chat_history_max_backoff: float = 30.0  # seconds; longest delay between flush retries while the database is down
+    
+    # Nearby-place results cached per geohash tile (PLACES_TILE_CACHE_SIZE=0 disables it)
+    places_tile_cache_size: int = 4096
+    places_tile_ttl: int = 21600  # seconds
+    
+    # Outbound HTTP clients, one connection pool per external API
+    http2_enabled: bool = True  # used when the h2 package is installed
+    http_keepalive_expiry: float = 30.0  # seconds an idle connection is kept
+    places_max_connections: int = 20
+    places_timeout: float = 10.0  # seconds
+    weather_max_connections: int = 10
+    weather_timeout: float = 5.0  # seconds
     
     # External APIs
     google_maps_api_key: str = "your_google_maps_api_key_here"
@@ -41,6 +132,9 @@ class Settings(BaseSettings):
     # MCP Server Configuration
     mcp_server_url: str = "http://localhost:3001"
     
+    # Internal API (metrics/diagnostics); requires X-Internal-Key, or a loopback client when unset
+    internal_api_key: str = ""
+    
     class Config:
         env_file = os.path.join(os.path.dirname(__file__), ".env")
         case_sensitive = False
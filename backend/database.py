@@ -1,29 +1,148 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import time
+
+from sqlalchemy import exc, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateIndex
 from config import settings
+from metrics import registry
+
+
+# Map sync driver URLs onto their asyncio equivalents so existing
+# DATABASE_URL values keep working unchanged.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Pool checkout wait buckets in seconds; anything near db_pool_timeout means the pool is undersized
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+pool_wait_seconds = registry.histogram("db_pool_wait_seconds", POOL_WAIT_BUCKETS)
+pool_timeouts = registry.counter("db_pool_timeouts")
+
+
+def get_async_database_url(url: str) -> str:
+    """Return the asyncio driver variant of a database URL"""
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        return url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
 
+def get_engine_options(url: str) -> dict:
+    """Pool options from settings; in-memory SQLite keeps its single static connection"""
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return {}
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+    }
 
-engine = create_engine(settings.database_url)
+
+engine = create_async_engine(
+    get_async_database_url(settings.database_url),
+    **get_engine_options(settings.database_url)
+)
 
 class Base(DeclarativeBase):
     pass
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps ORM attributes readable after commit without
+# an implicit (and, under asyncio, forbidden) lazy refresh.
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+def get_pool_status() -> dict:
+    """Live connection pool statistics"""
+    pool = engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool_class": type(pool).__name__}
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.db_max_overflow,
+        "timeout": settings.db_pool_timeout,
+        "timeouts": pool_timeouts.value,
+        "wait_seconds": pool_wait_seconds.snapshot(),
+    }
+
+
+registry.gauge("db_pool_checked_out", lambda: get_pool_status().get("checked_out"))
+registry.gauge("db_pool_overflow", lambda: get_pool_status().get("overflow"))
 
 
 # Database Dependency
-def get_db():
+async def get_db():
     """Get PostgreSQL database session"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def create_missing_indexes(conn):
+    """Create model indexes missing from existing tables (idempotent).
+
+    A unique index is skipped with a warning while the table holds rows it
+    would reject, e.g. usernames differing only in case; resolve those and
+    restart to create it.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if conn.dialect.has_index(conn, table.name, index.name):
+                continue
+            if index.unique:
+                duplicate = conn.execute(
+                    select(*index.expressions)
+                    .group_by(*index.expressions)
+                    .having(func.count() > 1)
+                    .limit(1)
+                ).first()
+                if duplicate is not None:
+                    print(f"Warning: not creating unique index {index.name}; "
+                          f"{table.name} has rows with duplicate values")
+                    continue
+            # Honors the index's ddl_if, e.g. the PostgreSQL-only trigram indexes
+            CreateIndex(index, if_not_exists=True)._invoke_with(conn)
 
 
 async def init_db():
     """Initialize databases"""
     # Create PostgreSQL tables
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Trigram operators/indexes used by user search
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so add their new indexes here
+        await conn.run_sync(create_missing_indexes)
     print("Database tables created successfully")
     print("Database initialization completed")
+
+
+async def close_db():
+    """Dispose of pooled database connections"""
+    await engine.dispose()
@@ -5,8 +5,8 @@ from contextlib import asynccontextmanager
 import uvicorn
 
 from config import settings
-from database import init_db
-from api import auth, users, itineraries, recommendations, chat
+from database import init_db, close_db
+from api import auth, users, itineraries, recommendations, chat, internal
 
 
 @asynccontextmanager
@@ -14,10 +14,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     await init_db()
+    recommendations.start_http_clients()
+    chat.chat_history_writer.start()
+    await chat.itinerary_job_manager.start()
     print("🚀 BARABULA API Server started successfully!")
     yield
     # Shutdown
     print("🛑 BARABULA API Server shutting down...")
+    await chat.itinerary_job_manager.stop()
+    await chat.conversation_memory.stop()
+    await chat.chat_history_writer.stop()
+    auth.password_hasher.shutdown()
+    await recommendations.stop_http_clients()
+    await close_db()
 
 
 app = FastAPI(
@@ -71,6 +80,7 @@ app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(itineraries.router, prefix="/api/v1/itineraries", tags=["Itineraries"])
 app.include_router(recommendations.router, prefix="/api/v1/recommendations", tags=["Recommendations"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
+app.include_router(internal.router, prefix="/internal", tags=["Internal"], include_in_schema=False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+"""
+In-process metrics primitives exposed through the internal API.
+
+Counters, gauges and histograms are registered by name on the module-level
+``registry`` and reported together by ``GET /internal/metrics``.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, Sequence
+
+
+# Latency buckets in seconds, from sub-millisecond DB checkouts up to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """Monotonically increasing counter"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative bucket counts"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            running += bucket_count
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = count
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+class MetricsRegistry:
+    """Named collection of counters, histograms and callback gauges"""
+
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str) -> Counter:
+        """Get or create the counter registered under name"""
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def histogram(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create the histogram registered under name"""
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(buckets)
+            return self._histograms[name]
+
+    def gauge(self, name: str, callback: Callable[[], float]):
+        """Register a gauge whose value is read from callback at snapshot time"""
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> Dict:
+        """Return the current value of every registered metric"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+        gauge_values = {}
+        for name, callback in gauges.items():
+            try:
+                gauge_values[name] = callback()
+            except Exception:
+                gauge_values[name] = None
+        return {
+            "counters": {name: counter.value for name, counter in sorted(counters.items())},
+            "gauges": dict(sorted(gauge_values.items())),
+            "histograms": {name: histogram.snapshot() for name, histogram in sorted(histograms.items())},
+        }
+
+
+registry = MetricsRegistry()
@@ -1,3 +1,5 @@
-from .user import User, Itinerary, ItineraryCollaborator, Activity, ChatHistory
+from .user import User, Itinerary, ItineraryCollaborator, Activity, ChatHistory, ConversationSummary, ItineraryJob
 
-__all__ = ["User", "Itinerary", "ItineraryCollaborator", "Activity", "ChatHistory"]
+__all__ = [
+    "User", "Itinerary", "ItineraryCollaborator", "Activity", "ChatHistory", "ConversationSummary", "ItineraryJob"
+]
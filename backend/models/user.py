@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -28,6 +28,25 @@ class User(Base):
     chat_history = relationship("ChatHistory", back_populates="user")
 
 
+# Keyset pagination of the active user list by (created_at, id)
+Index("ix_users_active_created_at_id", User.is_active, User.created_at, User.id)
+
+# Case-insensitive identifiers: back the single-query login lookup and make
+# registration conflicts surface as unique violations.
+Index("ix_users_username_lower", func.lower(User.username), unique=True)
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
+
+# Trigram indexes for substring/fuzzy user search (requires the pg_trgm extension)
+Index(
+    "ix_users_username_trgm", User.username,
+    postgresql_using="gin", postgresql_ops={"username": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+Index(
+    "ix_users_full_name_trgm", User.full_name,
+    postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}
+).ddl_if(dialect="postgresql")
+
+
 class Itinerary(Base):
     __tablename__ = "itineraries"
     
@@ -53,11 +72,15 @@ class Itinerary(Base):
     activities = relationship("Activity", back_populates="itinerary")
 
 
+# Keyset pagination of a user's itineraries by (created_at, id)
+Index("ix_itineraries_owner_created_at_id", Itinerary.owner_id, Itinerary.created_at, Itinerary.id)
+
+
 class ItineraryCollaborator(Base):
     __tablename__ = "itinerary_collaborators"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    itinerary_id = Column(String, ForeignKey("itineraries.id"), nullable=False)
+    itinerary_id = Column(String, ForeignKey("itineraries.id"), nullable=False, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     role = Column(String, default="viewer")  # owner, editor, viewer
     permissions = Column(JSON, default={})
@@ -108,3 +131,39 @@ class ChatHistory(Base):
     
     # Relationship
     user = relationship("User", back_populates="chat_history")
+
+
+# Newest-first history pages and per-user exports by (timestamp, id)
+Index(
+    "ix_chat_history_user_timestamp_id",
+    ChatHistory.user_id, ChatHistory.timestamp.desc(), ChatHistory.id.desc()
+)
+
+
+class ConversationSummary(Base):
+    __tablename__ = "conversation_summaries"
+    
+    # Rolling summary of the chat turns that left a user's conversation window
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    summary = Column(Text, nullable=False, default="")
+    # (timestamp, id) of the newest chat_history row the summary covers
+    summarized_until = Column(DateTime(timezone=True), nullable=True)
+    summarized_until_id = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ItineraryJob(Base):
+    __tablename__ = "itinerary_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String, default="pending", index=True)  # pending, running, succeeded, failed
+    request = Column(JSON, nullable=False)
+    itinerary_id = Column(String, ForeignKey("itineraries.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    # Lease held by the job manager running the job; expired leases are reclaimed
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,17 +1,21 @@
 from .schemas import (
     User, UserCreate, UserUpdate, UserInDB, UserLogin,
     Token, TokenData,
-    Itinerary, ItineraryCreate, ItineraryUpdate, ItineraryInDB,
+    Itinerary, ItineraryCreate, ItineraryUpdate, ItineraryInDB, ItinerarySummary,
     Activity, ActivityCreate, ActivityUpdate, ActivityInDB,
     ItineraryCollaborator, CollaboratorCreate, CollaboratorUpdate,
-    Location, ChatMessage, ChatResponse, ItineraryGenerationRequest
+    Location, ChatMessage, ChatResponse, ItineraryGenerationRequest, ItineraryJob,
+    TranslationBatchRequest, TranslationBatchResponse,
+    UserPage, ItineraryPage, ItinerarySummaryPage
 )
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserInDB", "UserLogin",
     "Token", "TokenData",
-    "Itinerary", "ItineraryCreate", "ItineraryUpdate", "ItineraryInDB",
+    "Itinerary", "ItineraryCreate", "ItineraryUpdate", "ItineraryInDB", "ItinerarySummary",
     "Activity", "ActivityCreate", "ActivityUpdate", "ActivityInDB",
     "ItineraryCollaborator", "CollaboratorCreate", "CollaboratorUpdate",
-    "Location", "ChatMessage", "ChatResponse", "ItineraryGenerationRequest"
+    "Location", "ChatMessage", "ChatResponse", "ItineraryGenerationRequest", "ItineraryJob",
+    "TranslationBatchRequest", "TranslationBatchResponse",
+    "UserPage", "ItineraryPage", "ItinerarySummaryPage"
 ]
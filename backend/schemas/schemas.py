@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Dict, List
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from typing import Annotated, Optional, Dict, List
 from datetime import datetime
 
 
@@ -96,7 +96,8 @@ class ItineraryInDB(ItineraryBase):
     id: str
     status: str
     ai_generated: bool
-    metadata: Dict
+    # Stored as extra_data; "metadata" is reserved on SQLAlchemy models
+    metadata: Dict = Field(default={}, validation_alias="extra_data")
     owner_id: str
     created_at: datetime
     updated_at: Optional[datetime]
@@ -110,6 +111,27 @@ class Itinerary(ItineraryInDB):
     collaborators: List["ItineraryCollaborator"] = []
 
 
+class ItinerarySummary(BaseModel):
+    """Lightweight itinerary projection for list views"""
+    id: str
+    title: str
+    destination: str
+    start_date: datetime
+    end_date: datetime
+    budget: Optional[float] = None
+    currency: str
+    status: str
+    is_public: bool
+    ai_generated: bool
+    owner_id: str
+    collaborator_count: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 # Activity Schemas
 class ActivityBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -150,7 +172,7 @@ class ActivityInDB(ActivityBase):
     id: str
     itinerary_id: str
     is_booked: bool
-    metadata: Dict
+    metadata: Dict = Field(default={}, validation_alias="extra_data")
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -201,6 +223,10 @@ class ChatResponse(BaseModel):
     context: Optional[Dict] = {}
 
 
+# Longest trip an itinerary can be generated for; bounds the OpenAI calls per request
+MAX_TRIP_DAYS = 30
+
+
 class ItineraryGenerationRequest(BaseModel):
     destination: str
     start_date: datetime
@@ -210,6 +236,55 @@ class ItineraryGenerationRequest(BaseModel):
     travel_style: str = "balanced"  # budget, mid-range, luxury, balanced
     group_size: int = 1
     special_requirements: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def check_duration(self):
+        duration = (self.end_date - self.start_date).days
+        if duration < 0:
+            raise ValueError("end_date must not be before start_date")
+        if duration > MAX_TRIP_DAYS:
+            raise ValueError(f"Trips can be at most {MAX_TRIP_DAYS} days long")
+        return self
+
+
+class TranslationBatchRequest(BaseModel):
+    texts: List[Annotated[str, Field(max_length=1000)]] = Field(..., min_length=1, max_length=500)
+    target_language: str = "en"
+
+
+class TranslationBatchResponse(BaseModel):
+    translations: List[str]
+    target_language: str
+    from_memory: int = 0
+
+
+class ItineraryJob(BaseModel):
+    id: str
+    status: str
+    itinerary_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+# Pagination Schemas
+class UserPage(BaseModel):
+    items: List[User]
+    next_cursor: Optional[str] = None
+
+
+class ItineraryPage(BaseModel):
+    items: List[Itinerary]
+    next_cursor: Optional[str] = None
+
+
+class ItinerarySummaryPage(BaseModel):
+    items: List[ItinerarySummary]
+    next_cursor: Optional[str] = None
 
 
 # Update forward references
@@ -0,0 +1,33 @@
+from .cache import TTLCache
+from .chat_history_writer import ChatHistoryWriter
+from .conversation_memory import Conversation, ConversationMemory
+from .geo_tiles import PlaceTileCache
+from .http_clients import HttpClients, HttpProvider
+from .itinerary_jobs import ItineraryJobManager, JobQueueFullError
+from .json_stream import StreamingObjectParser
+from .model_router import ModelRoute, ModelRouter
+from .openai_limiter import OpenAILimiter
+from .pagination import InvalidCursorError, keyset_paginate, split_page
+from .password_hasher import PasswordHasher, HasherBusyError
+from .places import PlacesClient, PlacesApiError
+from .prompts import PromptTemplate, compact_json, count_tokens, fit_json
+from .single_flight import SingleFlight
+from .user_search import UserSearchIndex, search_users
+
+__all__ = [
+    "TTLCache",
+    "ChatHistoryWriter",
+    "Conversation", "ConversationMemory",
+    "PlaceTileCache",
+    "HttpClients", "HttpProvider",
+    "ItineraryJobManager", "JobQueueFullError",
+    "StreamingObjectParser",
+    "ModelRoute", "ModelRouter",
+    "OpenAILimiter",
+    "InvalidCursorError", "keyset_paginate", "split_page",
+    "PasswordHasher", "HasherBusyError",
+    "PlacesClient", "PlacesApiError",
+    "PromptTemplate", "compact_json", "count_tokens", "fit_json",
+    "SingleFlight",
+    "UserSearchIndex", "search_users"
+]
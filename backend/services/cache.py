@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from metrics import registry
+
+
+class TTLCache:
+    """In-process LRU cache whose entries also expire after a fixed TTL.
+
+    Hit, miss and eviction counts, the hit rate and the current size are
+    registered on the metrics registry under ``<name>_*``. When
+    ``max_entry_size`` is set, values whose caller-supplied size exceeds it
+    are not stored. Not thread-safe; intended for use from the event loop only.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, max_entry_size: Optional[int] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_entry_size = max_entry_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = registry.counter(f"{name}_hits")
+        self.misses = registry.counter(f"{name}_misses")
+        self.evictions = registry.counter(f"{name}_evictions")
+        self.oversize = registry.counter(f"{name}_oversize")
+        registry.gauge(f"{name}_size", lambda: len(self._entries))
+        registry.gauge(f"{name}_hit_rate", self.hit_rate)
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits.value + self.misses.value
+        return self.hits.value / lookups if lookups else 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses.inc()
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses.inc()
+            return default
+        self._entries.move_to_end(key)
+        self.hits.inc()
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like ``get`` but without counting a lookup or refreshing recency"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: Optional[int] = None) -> bool:
+        """Store value under key, evicting the least recently used entries if full.
+
+        Returns False if the value was not stored because it is too large.
+        """
+        if self.maxsize <= 0:
+            return False
+        if self.max_entry_size is not None and size is not None and size > self.max_entry_size:
+            self.oversize.inc()
+            return False
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions.inc()
+        return True
+
+    def invalidate(self, key: Hashable):
+        """Drop key from the cache if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,193 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from metrics import registry
+from models import ChatHistory
+
+
+# Errors the database raises for the rows themselves; anything else (connection
+# loss, timeouts, failover) is treated as transient and the rows are kept
+REJECTED_ROW_ERRORS = (IntegrityError, DataError)
+
+
+class ChatHistoryWriter:
+    """Write-behind buffer that batches ChatHistory inserts.
+
+    Records are appended in memory and flushed as one multi-row INSERT when
+    ``batch_size`` records are waiting or ``flush_interval`` seconds have
+    passed. If the database rejects a batch's content (``IntegrityError``,
+    ``DataError``) the batch is inserted row by row and the rejected rows are
+    dead-lettered (logged, counted as ``chat_history_dead_lettered`` and
+    dropped), so one bad row cannot block later writes. Any other failure
+    (the database is unreachable, a timeout) keeps the rows buffered and
+    retries with exponential backoff from ``flush_interval`` up to
+    ``max_backoff``; nothing is dropped for an outage until ``max_buffer``
+    is reached, after which ``add`` drops new records and counts them as
+    ``chat_history_dropped``. ``stop()`` flushes whatever is left, so call
+    it from the app lifespan shutdown.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int, flush_interval: float,
+                 max_buffer: int, max_backoff: float = 30.0):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_backoff = max_backoff
+        self._buffer: List[Dict] = []
+        self._inserting: List[Dict] = []
+        self._failed_attempts = 0
+        self._retry_at = 0.0
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_seconds = registry.histogram("chat_history_flush_seconds")
+        self._flushed_rows = registry.counter("chat_history_flushed_rows")
+        self._flush_failures = registry.counter("chat_history_flush_failures")
+        self._dead_lettered = registry.counter("chat_history_dead_lettered")
+        self._dropped = registry.counter("chat_history_dropped")
+        registry.gauge("chat_history_queue_depth", lambda: len(self._buffer))
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def backing_off(self) -> bool:
+        """Whether the last flush failed and its retry delay has not passed yet"""
+        return time.monotonic() < self._retry_at
+
+    def pending(self, user_id: str) -> List[Dict]:
+        """A user's records not yet committed (buffered or being inserted), oldest first"""
+        return [record for record in self._inserting + self._buffer if record["user_id"] == user_id]
+
+    def start(self):
+        """Start the background flush loop"""
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and persist everything still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._buffer:
+            if not await self.flush():
+                print(f"Dropping {len(self._buffer)} unsaved chat history records on shutdown")
+                break
+
+    async def add(self, user_id: str, message: str, response: str, context: Dict, suggestions: List[str]) -> Dict:
+        """Buffer a chat record for insertion and return it (with its id and timestamp).
+
+        The record is dropped (and counted) if the buffer is still full after
+        an inline flush, which is skipped while failed flushes are backing off.
+        """
+        record = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "message": message,
+            "response": response,
+            "context": context,
+            "suggestions": suggestions,
+            # Stamped now rather than at flush time to keep history ordering exact
+            "timestamp": datetime.now(timezone.utc),
+        }
+        if len(self._buffer) >= self.max_buffer:
+            if not self.backing_off:
+                await self.flush()
+            if len(self._buffer) >= self.max_buffer:
+                self._dropped.inc()
+                print(f"Chat history buffer full; dropping record {record['id']}")
+                return record
+        self._buffer.append(record)
+        if self._task is None:
+            await self.flush()
+        elif len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    async def flush(self) -> bool:
+        """Insert buffered records in batches; returns False if a batch failed"""
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:len(batch)]
+                start = time.perf_counter()
+                self._inserting = batch
+                try:
+                    await self._insert(batch)
+                except REJECTED_ROW_ERRORS as e:
+                    print(f"Chat history batch rejected, inserting row by row: {e}")
+                    self._flush_failures.inc()
+                    if not await self._insert_rows(batch):
+                        return False
+                    continue
+                except Exception as e:
+                    print(f"Error flushing chat history: {e}")
+                    self._flush_failures.inc()
+                    self._buffer[:0] = batch
+                    self._back_off()
+                    return False
+                finally:
+                    self._inserting = []
+                self._failed_attempts = 0
+                self._retry_at = 0.0
+                self._flush_seconds.observe(time.perf_counter() - start)
+                self._flushed_rows.inc(len(batch))
+        return True
+
+    def _back_off(self):
+        """Delay the next flush exponentially while failures continue"""
+        self._failed_attempts += 1
+        delay = min(self.flush_interval * 2 ** (self._failed_attempts - 1), self.max_backoff)
+        self._retry_at = time.monotonic() + delay
+
+    async def _insert(self, rows: List[Dict]):
+        async with self.session_factory() as db:
+            await db.execute(insert(ChatHistory), rows)
+            await db.commit()
+
+    async def _insert_rows(self, batch: List[Dict]) -> bool:
+        """Insert a rejected batch row by row, dead-lettering the rows the database rejects.
+
+        On a transient failure the rows not yet inserted go back to the
+        buffer and False is returned.
+        """
+        saved = 0
+        for index, row in enumerate(batch):
+            try:
+                await self._insert([row])
+            except REJECTED_ROW_ERRORS as e:
+                self._dead_lettered.inc()
+                print(f"Dead-lettering chat history record {row['id']} for user {row['user_id']}: {e}")
+                continue
+            except Exception as e:
+                print(f"Error flushing chat history: {e}")
+                self._buffer[:0] = batch[index:]
+                self._flushed_rows.inc(saved)
+                self._back_off()
+                return False
+            saved += 1
+        self._flushed_rows.inc(saved)
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._buffer and not self.backing_off:
+                await self.flush()
@@ -0,0 +1,193 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from metrics import registry
+from models import ChatHistory, ConversationSummary
+from .cache import TTLCache
+
+
+Turn = Tuple[str, str]  # (user message, assistant response)
+
+# (timestamp, id) of the chat_history row a turn was stored as; orders like the history index
+RowKey = Tuple[datetime, str]
+
+# Folds turns that left the window into the previous summary and returns the new summary
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+# A user's chat records not yet committed to chat_history, oldest first
+PendingRecords = Callable[[str], List[Dict]]
+
+
+def _utc(timestamp: datetime) -> datetime:
+    """Naive UTC, so database timestamps with and without a zone compare"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def row_key(timestamp: datetime, row_id: str) -> RowKey:
+    return _utc(timestamp), row_id
+
+
+class Conversation:
+    """A user's recent turns plus a summary of everything before them"""
+
+    def __init__(self, user_id: str, max_turns: int, summary: str = "",
+                 summarized_until: Optional[RowKey] = None):
+        self.user_id = user_id
+        self.turns: Deque[Turn] = deque(maxlen=max_turns)
+        self.keys: Deque[Optional[RowKey]] = deque(maxlen=max_turns)
+        self.summary = summary
+        self.summarized_until = summarized_until
+        self.pending_turns: List[Tuple[Optional[RowKey], Turn]] = []
+        self.summarizing = False
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.turns and not self.summary
+
+    def append(self, turn: Turn, key: Optional[RowKey]) -> Optional[Tuple[Optional[RowKey], Turn]]:
+        """Add a turn to the window; returns the turn it pushed out, if any"""
+        pushed_out = (self.keys[0], self.turns[0]) if len(self.turns) == self.turns.maxlen else None
+        self.turns.append(turn)
+        self.keys.append(key)
+        return pushed_out
+
+
+class ConversationMemory:
+    """Per-user chat memory that stays the same size however long a chat runs.
+
+    The last ``max_turns`` turns are kept verbatim; a turn pushed out of that
+    window is folded into a rolling summary by ``summarizer`` in the
+    background, one update at a time per user. Each summary update is saved
+    to ``conversation_summaries`` with the (timestamp, id) of the newest
+    ``chat_history`` row it covers.
+
+    Conversations are cached per process. On a miss (expiry, another
+    worker, a restart) the conversation is rebuilt from the saved summary,
+    the newest ``2 * max_turns`` ``chat_history`` rows and the records
+    ``pending`` reports as not yet written; rows older than the window and
+    newer than the summary are queued for summarizing again. Replies equal
+    to ``error_response`` are stored in history but are never part of the
+    conversation. With several workers each keeps its own window and the
+    last summary saved wins.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, summarizer: Summarizer,
+                 max_turns: int, cache_size: int, ttl: float, pending: Optional[PendingRecords] = None,
+                 error_response: Optional[str] = None):
+        self.session_factory = session_factory
+        self.summarizer = summarizer
+        self.pending = pending
+        self.error_response = error_response
+        self.max_turns = max_turns
+        self._cache = TTLCache("conversation_memory", maxsize=cache_size, ttl=ttl)
+        self._tasks: Set[asyncio.Task] = set()
+        self._summary_failures = registry.counter("conversation_summary_failures")
+        registry.gauge("conversation_summaries_running", lambda: len(self._tasks))
+
+    async def get(self, user_id: str) -> Conversation:
+        """Return the user's conversation, rebuilding it from the database on a cache miss"""
+        conversation = self._cache.get(user_id)
+        if conversation is None:
+            conversation = await self._load(user_id)
+            self._cache.set(user_id, conversation)
+            self._start_summary(conversation)
+        return conversation
+
+    def record(self, user_id: str, conversation: Conversation, message: str, response: str,
+               key: Optional[RowKey] = None):
+        """Append a turn stored as history row key; the turn it pushes out of the window is summarized in the background"""
+        pushed_out = conversation.append((message, response), key)
+        if pushed_out is not None:
+            conversation.pending_turns.append(pushed_out)
+        # Re-store to refresh the TTL while the user is active
+        self._cache.set(user_id, conversation)
+        self._start_summary(conversation)
+
+    def invalidate(self, user_id: str):
+        """Forget a user's conversation"""
+        self._cache.invalidate(user_id)
+
+    async def stop(self):
+        """Cancel summary updates still in flight"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start_summary(self, conversation: Conversation):
+        if conversation.pending_turns and not conversation.summarizing:
+            conversation.summarizing = True
+            task = asyncio.create_task(self._summarize(conversation))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, user_id: str) -> Conversation:
+        stmt = (
+            select(ChatHistory.id, ChatHistory.timestamp, ChatHistory.message, ChatHistory.response)
+            .where(ChatHistory.user_id == user_id)
+            .order_by(ChatHistory.timestamp.desc(), ChatHistory.id.desc())
+            .limit(2 * self.max_turns)
+        )
+        if self.error_response is not None:
+            stmt = stmt.where(ChatHistory.response != self.error_response)
+        async with self.session_factory() as db:
+            saved = await db.get(ConversationSummary, user_id)
+            rows = list(reversed((await db.execute(stmt)).all()))
+
+        rows = [(row_key(row.timestamp, row.id), (row.message, row.response)) for row in rows]
+        # Records still in the write-behind buffer; skip any committed since the query
+        loaded = {key[1] for key, _ in rows}
+        for record in self.pending(user_id) if self.pending else []:
+            if record["id"] not in loaded and record["response"] != self.error_response:
+                rows.append((row_key(record["timestamp"], record["id"]), (record["message"], record["response"])))
+
+        summarized_until = None
+        if saved is not None and saved.summarized_until is not None:
+            summarized_until = row_key(saved.summarized_until, saved.summarized_until_id)
+        conversation = Conversation(user_id, self.max_turns, saved.summary if saved else "", summarized_until)
+        for key, turn in rows:
+            pushed_out = conversation.append(turn, key)
+            if pushed_out is not None and (summarized_until is None or pushed_out[0] > summarized_until):
+                conversation.pending_turns.append(pushed_out)
+        return conversation
+
+    async def _save_summary(self, conversation: Conversation):
+        async with self.session_factory() as db:
+            saved = await db.get(ConversationSummary, conversation.user_id)
+            if saved is None:
+                saved = ConversationSummary(user_id=conversation.user_id)
+                db.add(saved)
+            saved.summary = conversation.summary
+            if conversation.summarized_until is not None:
+                saved.summarized_until, saved.summarized_until_id = conversation.summarized_until
+            await db.commit()
+
+    async def _summarize(self, conversation: Conversation):
+        try:
+            while conversation.pending_turns:
+                pending = conversation.pending_turns
+                conversation.pending_turns = []
+                try:
+                    conversation.summary = await self.summarizer(conversation.summary, [turn for _, turn in pending])
+                except Exception as e:
+                    # Keep the turns and retry with the next update
+                    print(f"Error summarizing conversation: {e}")
+                    self._summary_failures.inc()
+                    conversation.pending_turns[:0] = pending
+                    return
+                keys = [key for key, _ in pending if key is not None]
+                if keys:
+                    conversation.summarized_until = max(keys)
+                try:
+                    await self._save_summary(conversation)
+                except Exception as e:
+                    # The in-memory summary is still used; the next update saves it again
+                    print(f"Error saving conversation summary: {e}")
+        finally:
+            conversation.summarizing = False
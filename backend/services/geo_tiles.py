@@ -0,0 +1,186 @@
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import registry
+from .cache import TTLCache
+from .single_flight import SingleFlight
+
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = 111320.0
+MAX_PRECISION = 9
+
+# Query radii are rounded up to one of these (meters); Nearby Search allows at most 50 km
+RADIUS_BUCKETS = (500, 1000, 2000, 5000, 10000, 20000, 50000)
+
+# (lat, lng, place_type, radius) -> shaped places, each with geometry {"lat", "lng"}
+PlaceFetcher = Callable[[float, float, str, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    """Geohash of the cell of the given precision containing (lat, lng)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    cell = []
+    bits = 0
+    value = 0
+    even = True
+    while len(cell) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            cell.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(cell)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(height, width) in degrees of a cell of the given precision"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def geohash_center(cell: str) -> Tuple[float, float]:
+    """(lat, lng) of the center of a geohash cell"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in cell:
+        value = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lng_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def geohash_neighbors(cell: str) -> List[str]:
+    """The (up to) eight cells surrounding a cell"""
+    lat, lng = geohash_center(cell)
+    height, width = geohash_cell_size(len(cell))
+    neighbors = []
+    for dlat in (-1, 0, 1):
+        for dlng in (-1, 0, 1):
+            neighbor_lat = lat + dlat * height
+            if (dlat, dlng) == (0, 0) or not -90 < neighbor_lat < 90:
+                continue
+            neighbor_lng = (lng + dlng * width + 180) % 360 - 180
+            neighbors.append(geohash_encode(neighbor_lat, neighbor_lng, len(cell)))
+    return neighbors
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def cell_half_diagonal_m(precision: int) -> float:
+    """Largest distance (at the equator) from a cell's center to its corner"""
+    height, width = geohash_cell_size(precision)
+    return math.hypot(height * METERS_PER_DEGREE, width * METERS_PER_DEGREE) / 2
+
+
+def radius_bucket(radius: int) -> int:
+    """The smallest bucket covering radius"""
+    return next((bucket for bucket in RADIUS_BUCKETS if radius <= bucket), RADIUS_BUCKETS[-1])
+
+
+def precision_for_radius(radius: int) -> int:
+    """Coarsest precision whose cells are small next to radius (half-diagonal at most radius / 2)"""
+    for precision in range(1, MAX_PRECISION + 1):
+        if cell_half_diagonal_m(precision) <= radius / 2:
+            return precision
+    return MAX_PRECISION
+
+
+def _location(place: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    geometry = place.get("geometry") or {}
+    if geometry.get("lat") is None or geometry.get("lng") is None:
+        return None
+    return geometry["lat"], geometry["lng"]
+
+
+class PlaceTileCache:
+    """Nearby-place results cached per geohash tile.
+
+    A query's radius is rounded up to a bucket and its point quantized to
+    the geohash cell sized for that bucket. The tile for (cell, place type,
+    bucket) is fetched once around the cell center with the radius widened
+    by the cell's half-diagonal, so its area covers the search area of any
+    point in the cell. Results are an approximation of a direct query: a
+    tile keeps only the first page Nearby Search returns (at most 20
+    places, ranked around the cell center; ``next_page_token`` is not
+    followed), so in dense areas a point can miss places a query centred
+    on it would have returned. Queries are answered from that tile,
+    merged with neighbouring tiles that happen to be cached, and filtered
+    to the requested radius around the actual point. Concurrent misses for
+    a tile share one fetch; calls avoided are counted as
+    ``places_tile_calls_saved`` and tile hit rate is ``places_tiles_hit_rate``.
+    """
+
+    def __init__(self, fetch: PlaceFetcher, maxsize: int, ttl: float):
+        self.fetch = fetch
+        self._tiles = TTLCache("places_tiles", maxsize=maxsize, ttl=ttl)
+        self._fetches = SingleFlight("places_tile_fetch")
+        self.fetches = registry.counter("places_tile_fetches")
+        self.calls_saved = registry.counter("places_tile_calls_saved")
+
+    async def _tile(self, cell: str, place_type: str, bucket: int) -> List[Dict[str, Any]]:
+        key = (cell, place_type, bucket)
+        places = self._tiles.get(key)
+        if places is not None:
+            self.calls_saved.inc()
+            return places
+
+        async def fetch() -> List[Dict[str, Any]]:
+            lat, lng = geohash_center(cell)
+            radius = min(RADIUS_BUCKETS[-1], math.ceil(bucket + cell_half_diagonal_m(len(cell))))
+            self.fetches.inc()
+            places = await self.fetch(lat, lng, place_type, radius)
+            self._tiles.set(key, places)
+            return places
+
+        places, shared = await self._fetches.do(key, fetch)
+        if shared:
+            self.calls_saved.inc()
+        return places
+
+    async def search(self, lat: float, lng: float, place_type: str, radius: int) -> List[Dict[str, Any]]:
+        """Places of place_type within radius meters of (lat, lng), in the API's order"""
+        bucket = radius_bucket(radius)
+        cell = geohash_encode(lat, lng, precision_for_radius(bucket))
+        places = list(await self._tile(cell, place_type, bucket))
+
+        # Cached neighbouring tiles add places near the cell edge at no cost
+        seen = {place.get("place_id") for place in places}
+        extra = []
+        for neighbor in geohash_neighbors(cell):
+            for place in self._tiles.peek((neighbor, place_type, bucket)) or []:
+                if place.get("place_id") not in seen and _location(place) is not None:
+                    seen.add(place.get("place_id"))
+                    extra.append(place)
+        extra.sort(key=lambda place: haversine_m(lat, lng, *_location(place)))
+
+        return [
+            place for place in places + extra
+            if _location(place) is None or haversine_m(lat, lng, *_location(place)) <= radius
+        ]
+
+    def clear(self):
+        """Drop every cached tile"""
+        self._tiles.clear()
@@ -0,0 +1,113 @@
+import time
+from typing import Dict, Optional, Sequence
+
+import httpx
+
+from metrics import registry
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # optional; clients fall back to HTTP/1.1 keep-alive
+    h2 = None
+
+
+class HttpProvider:
+    """Connection limits and timeouts for one external API"""
+
+    def __init__(self, name: str, base_url: str = "", max_connections: int = 10,
+                 max_keepalive_connections: Optional[int] = None, timeout: float = 10.0,
+                 connect_timeout: Optional[float] = None):
+        self.name = name
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections or max_connections
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout or timeout
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper recording request latency and whether each request opened a connection"""
+
+    def __init__(self, name: str, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._latency = registry.histogram(f"http_{name}_request_seconds")
+        self._opened = registry.counter(f"http_{name}_connections_opened")
+        self._reused = registry.counter(f"http_{name}_connections_reused")
+        self._errors = registry.counter(f"http_{name}_errors")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        opened = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event: str, info: Dict):
+            nonlocal opened
+            # connection.connect_tcp.complete / connect_unix_socket.complete: a new connection
+            if event.startswith("connection.connect_") and event.endswith(".complete"):
+                opened = True
+            if parent_trace is not None:
+                await parent_trace(event, info)
+
+        request.extensions["trace"] = trace
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._latency.observe(time.perf_counter() - started)
+        (self._opened if opened else self._reused).inc()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class HttpClients:
+    """One pooled ``httpx.AsyncClient`` per external provider.
+
+    Clients are created by ``start`` and closed by ``aclose`` (both called
+    from the application lifespan), so requests to a provider share
+    keep-alive connections, and HTTP/2 when the ``h2`` package is
+    installed. Each provider has its own connection limits and timeouts,
+    and reports request latency plus new vs reused connections as
+    ``http_<provider>_*`` metrics.
+    """
+
+    def __init__(self, providers: Sequence[HttpProvider], http2: bool = True, keepalive_expiry: float = 30.0):
+        self.providers = {provider.name: provider for provider in providers}
+        self.http2 = http2 and h2 is not None
+        self.keepalive_expiry = keepalive_expiry
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def start(self):
+        """Create a client for every provider"""
+        for name, provider in self.providers.items():
+            if name in self._clients:
+                continue
+            transport = httpx.AsyncHTTPTransport(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=provider.max_connections,
+                    max_keepalive_connections=provider.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+            )
+            self._clients[name] = httpx.AsyncClient(
+                base_url=provider.base_url,
+                transport=MeteredTransport(name, transport),
+                timeout=httpx.Timeout(provider.timeout, connect=provider.connect_timeout),
+            )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """The shared client for a provider; ``start`` must have been called"""
+        try:
+            return self._clients[name]
+        except KeyError:
+            raise RuntimeError(f"HTTP client for {name!r} is not started") from None
+
+    async def aclose(self):
+        """Close every client and its connections"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
@@ -0,0 +1,224 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from metrics import registry
+from models import ItineraryJob
+
+
+# Runs a claimed job inside the given session and returns the created itinerary id
+JobRunner = Callable[[AsyncSession, ItineraryJob], Awaitable[str]]
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many jobs are already waiting for a worker"""
+
+
+# Stored on failed jobs and shown to clients; the exception itself is only logged
+JOB_FAILED_MESSAGE = "Itinerary generation failed. Please try again."
+
+
+class ItineraryJobManager:
+    """Runs itinerary generation jobs on a bounded pool of asyncio workers.
+
+    Jobs are rows in ``itinerary_jobs``: ``submit`` inserts a pending row and
+    queues its id, and a worker claims it (pending -> running) under this
+    manager's ``worker_id``, calls the runner and records the outcome. While
+    a job runs its ``heartbeat_at`` is renewed every ``lease_seconds / 3``;
+    any manager sharing the database reclaims running jobs whose lease has
+    expired (their process died) and queues them again, so accepted jobs
+    survive restarts without a live worker's jobs being run twice. Pending
+    jobs are queued again on ``start``. Status changes wake local
+    ``wait_for_change`` callers; other processes fall back to polling.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, runner: JobRunner, workers: int, max_queue: int,
+                 lease_seconds: float = 60.0):
+        self.session_factory = session_factory
+        self.runner = runner
+        self.workers = workers
+        self.max_queue = max_queue
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._active: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._waiters: Dict[str, Set[asyncio.Event]] = {}
+        self._duration = registry.histogram("itinerary_job_duration_seconds")
+        self._queue_wait = registry.histogram("itinerary_job_queue_wait_seconds")
+        self._succeeded = registry.counter("itinerary_jobs_succeeded")
+        self._failed = registry.counter("itinerary_jobs_failed")
+        self._rejected = registry.counter("itinerary_jobs_rejected")
+        self._reclaimed = registry.counter("itinerary_jobs_reclaimed")
+        registry.gauge("itinerary_job_queue_depth", lambda: self.queue_depth)
+        registry.gauge("itinerary_job_running", lambda: self._running)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start the workers and re-queue pending jobs and jobs whose lease expired"""
+        self._queue = asyncio.Queue()
+        async with self.session_factory() as db:
+            await self._reclaim_expired(db)
+            result = await db.execute(
+                select(ItineraryJob.id)
+                .where(ItineraryJob.status == "pending")
+                .order_by(ItineraryJob.created_at)
+            )
+            for job_id in result.scalars().all():
+                self._queue.put_nowait((job_id, time.perf_counter()))
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        """Stop the workers; their jobs are reclaimed once their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, db: AsyncSession, user_id: str, request: Dict) -> ItineraryJob:
+        """Persist a pending job and queue it for a worker"""
+        if self.queue_depth >= self.max_queue:
+            self._rejected.inc()
+            raise JobQueueFullError()
+        job = ItineraryJob(
+            user_id=user_id,
+            status="pending",
+            request=request,
+            created_at=datetime.now(timezone.utc)
+        )
+        db.add(job)
+        await db.commit()
+        self._queue.put_nowait((job.id, time.perf_counter()))
+        return job
+
+    async def wait_for_change(self, job_id: str, timeout: float):
+        """Wait until this process updates the job or the timeout passes"""
+        event = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    async def _reclaim_expired(self, db: AsyncSession) -> List[str]:
+        """Reset running jobs whose lease expired to pending; returns their ids"""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        expired = or_(
+            ItineraryJob.heartbeat_at < cutoff,
+            and_(ItineraryJob.heartbeat_at.is_(None), ItineraryJob.started_at < cutoff)
+        )
+        result = await db.execute(
+            select(ItineraryJob.id).where(ItineraryJob.status == "running", expired)
+        )
+        reclaimed = []
+        for job_id in result.scalars().all():
+            # Re-check the lease so a job renewed in the meantime is left alone
+            updated = await db.execute(
+                update(ItineraryJob)
+                .where(ItineraryJob.id == job_id, ItineraryJob.status == "running", expired)
+                .values(status="pending", started_at=None, worker_id=None, heartbeat_at=None)
+            )
+            if updated.rowcount == 1:
+                reclaimed.append(job_id)
+        await db.commit()
+        if reclaimed:
+            self._reclaimed.inc(len(reclaimed))
+            print(f"Reclaimed {len(reclaimed)} itinerary jobs with expired leases")
+        return reclaimed
+
+    async def _heartbeat(self):
+        """Renew the leases of running jobs and pick up jobs abandoned by dead processes"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    if self._active:
+                        await db.execute(
+                            update(ItineraryJob)
+                            .where(
+                                ItineraryJob.id.in_(list(self._active)),
+                                ItineraryJob.worker_id == self.worker_id,
+                                ItineraryJob.status == "running"
+                            )
+                            .values(heartbeat_at=datetime.now(timezone.utc))
+                        )
+                        await db.commit()
+                    for job_id in await self._reclaim_expired(db):
+                        self._queue.put_nowait((job_id, time.perf_counter()))
+            except Exception as e:
+                print(f"Error renewing itinerary job leases: {e}")
+
+    def _notify(self, job_id: str):
+        for event in self._waiters.get(job_id, ()):
+            event.set()
+
+    async def _work(self):
+        while True:
+            job_id, queued_at = await self._queue.get()
+            self._queue_wait.observe(time.perf_counter() - queued_at)
+            self._running += 1
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"Error running itinerary job {job_id}: {e}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        async with self.session_factory() as db:
+            # Claim atomically so a job queued twice only runs once
+            now = datetime.now(timezone.utc)
+            claimed = await db.execute(
+                update(ItineraryJob)
+                .where(ItineraryJob.id == job_id, ItineraryJob.status == "pending")
+                .values(status="running", started_at=now, worker_id=self.worker_id, heartbeat_at=now)
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return
+            self._notify(job_id)
+            job = await db.get(ItineraryJob, job_id)
+
+            self._active.add(job_id)
+            start = time.perf_counter()
+            try:
+                itinerary_id = await self.runner(db, job)
+            except Exception as e:
+                print(f"Itinerary job {job_id} failed: {e!r}")
+                await db.rollback()
+                values = {"status": "failed", "error": JOB_FAILED_MESSAGE}
+                self._failed.inc()
+            else:
+                values = {"status": "succeeded", "itinerary_id": itinerary_id}
+                self._succeeded.inc()
+            finally:
+                self._active.discard(job_id)
+            self._duration.observe(time.perf_counter() - start)
+
+            # Only the lease holder records the outcome
+            await db.execute(
+                update(ItineraryJob)
+                .where(ItineraryJob.id == job_id, ItineraryJob.worker_id == self.worker_id)
+                .values(finished_at=datetime.now(timezone.utc), **values)
+            )
+            await db.commit()
+        self._notify(job_id)
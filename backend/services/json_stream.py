@@ -0,0 +1,113 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class StreamingObjectParser:
+    """Incremental parser for a JSON object arriving in chunks (e.g. a streamed completion).
+
+    ``feed`` returns the elements of the ``array_key`` array that completed in
+    that chunk, so callers can act on each one before the object is finished.
+    Every top-level field is also parsed as soon as its value completes, so
+    ``result()`` can salvage whatever arrived intact if the tail is
+    malformed or cut off. Text before the first ``{`` is ignored.
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self.fields: Dict[str, Any] = {}
+        self.items: List[Any] = []
+        self.complete = False
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._expecting_key = False
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._in_array_value = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return the array items completed by it"""
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+        while self._pos < len(buffer) and not self.complete:
+            char = buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expecting_key:
+                        self._key = json.loads(buffer[self._string_start:self._pos + 1])
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+                self._begin_value()
+            elif char in "{[":
+                self._begin_value()
+                if self._in_array_value and self._depth == 2 and char == "{":
+                    self._item_start = self._pos
+                self._depth += 1
+                if self._depth == 1:
+                    self._expecting_key = True
+                elif self._depth == 2 and char == "[" and self._key == self.array_key:
+                    self._in_array_value = True
+            elif char in "}]":
+                if self._depth == 0:
+                    pass
+                else:
+                    self._depth -= 1
+                    if self._depth == 2 and self._item_start is not None and char == "}":
+                        item = self._parse(buffer[self._item_start:self._pos + 1])
+                        if item is not None:
+                            self.items.append(item)
+                            completed.append(item)
+                        self._item_start = None
+                    elif self._depth == 1 and char == "]":
+                        self._in_array_value = False
+                    elif self._depth == 0:
+                        self._end_value(self._pos)
+                        self.complete = True
+            elif self._depth == 1:
+                if char == ",":
+                    self._end_value(self._pos)
+                    self._expecting_key = True
+                elif char == ":":
+                    self._expecting_key = False
+                elif not char.isspace():
+                    self._begin_value()
+            self._pos += 1
+        return completed
+
+    def _begin_value(self):
+        # The first character of a top-level value after its key and colon
+        if self._depth == 1 and not self._expecting_key and self._value_start is None:
+            self._value_start = self._pos
+
+    def _end_value(self, end: int):
+        if self._key is not None and self._value_start is not None:
+            value = self._parse(self._buffer[self._value_start:end])
+            if value is not None or self._buffer[self._value_start:end].strip() == "null":
+                self.fields[self._key] = value
+        self._key = None
+        self._value_start = None
+
+    @staticmethod
+    def _parse(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+    def result(self) -> Dict[str, Any]:
+        """The parsed object, or the fields and array items salvaged so far"""
+        data = dict(self.fields)
+        if self.array_key not in data or not self.complete:
+            data[self.array_key] = list(self.items)
+        return data
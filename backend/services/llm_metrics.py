@@ -0,0 +1,33 @@
+from typing import Any, Dict, Sequence
+
+from metrics import registry
+from .prompts import count_message_tokens, count_tokens
+
+
+# Token count buckets, from short chat replies up to full itinerary prompts
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+def record_llm_call(endpoint: str, seconds: float, prompt_tokens: int, completion_tokens: int):
+    """Record latency and token usage of one OpenAI call under endpoint"""
+    registry.counter(f"openai_{endpoint}_calls").inc()
+    registry.counter(f"openai_{endpoint}_prompt_tokens").inc(prompt_tokens)
+    registry.counter(f"openai_{endpoint}_completion_tokens").inc(completion_tokens)
+    registry.histogram(f"openai_{endpoint}_prompt_tokens_per_call", TOKEN_BUCKETS).observe(prompt_tokens)
+    registry.histogram(f"openai_{endpoint}_latency_seconds").observe(seconds)
+
+
+def record_completion(endpoint: str, seconds: float, messages: Sequence[Dict[str, str]], response: Any):
+    """Record a non-streaming completion, preferring the usage OpenAI reports"""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+    else:
+        content = response.choices[0].message.content or ""
+        prompt_tokens, completion_tokens = count_message_tokens(messages), count_tokens(content)
+    record_llm_call(endpoint, seconds, prompt_tokens, completion_tokens)
+
+
+def record_stream(endpoint: str, seconds: float, messages: Sequence[Dict[str, str]], completion: str):
+    """Record a streamed completion; streams carry no usage, so tokens are counted locally"""
+    record_llm_call(endpoint, seconds, count_message_tokens(messages), count_tokens(completion))
@@ -0,0 +1,127 @@
+import math
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from metrics import registry
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile (0-100) of a non-empty list"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class ModelRoute:
+    """Primary model for a request class, a faster fallback and the latency SLO it is held to"""
+
+    def __init__(self, primary: str, fallback: Optional[str] = None, slo_p95_seconds: Optional[float] = None):
+        self.primary = primary
+        self.fallback = fallback or None
+        self.slo_p95_seconds = slo_p95_seconds
+
+    def to_dict(self) -> Dict:
+        return {"primary": self.primary, "fallback": self.fallback, "slo_p95_seconds": self.slo_p95_seconds}
+
+
+class ModelStats:
+    """Rolling latency and error samples for one (request class, model) pair"""
+
+    def __init__(self, window_size: int, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=window_size)
+
+    def record(self, seconds: float, ok: bool):
+        self._samples.append((time.monotonic(), seconds, ok))
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def snapshot(self) -> Dict:
+        self._prune()
+        latencies = [seconds for _, seconds, ok in self._samples if ok]
+        errors = sum(1 for _, _, ok in self._samples if not ok)
+        count = len(self._samples)
+        return {
+            "samples": count,
+            "p50_seconds": percentile(latencies, 50) if latencies else None,
+            "p95_seconds": percentile(latencies, 95) if latencies else None,
+            "error_rate": errors / count if count else 0.0,
+        }
+
+
+class ModelRouter:
+    """Chooses the model for each request class from its route and recent behaviour.
+
+    Each request class routes to its primary model until, over the last
+    ``window_seconds`` (at most ``window_size`` calls, and only once
+    ``min_samples`` have been seen), the primary's p95 latency exceeds the
+    route's SLO or its error rate exceeds ``max_error_rate``; requests then
+    go to the fallback. While degraded, ``probe_ratio`` of requests still go
+    to the primary so its statistics stay current and routing recovers when
+    it does. Decisions are counted per class and model and the latest one is
+    kept for the internal API.
+    """
+
+    def __init__(self, routes: Dict[str, ModelRoute], window_size: int, window_seconds: float,
+                 min_samples: int, max_error_rate: float, probe_ratio: float):
+        self.routes = routes
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.probe_ratio = probe_ratio
+        self._stats: Dict[Tuple[str, str], ModelStats] = {}
+        self._last_decisions: Dict[str, Dict] = {}
+
+    def _stats_for(self, request_class: str, model: str) -> ModelStats:
+        key = (request_class, model)
+        if key not in self._stats:
+            self._stats[key] = ModelStats(self.window_size, self.window_seconds)
+        return self._stats[key]
+
+    def _degraded_reason(self, request_class: str, route: ModelRoute) -> Optional[str]:
+        stats = self._stats_for(request_class, route.primary).snapshot()
+        if stats["samples"] < self.min_samples:
+            return None
+        if stats["error_rate"] > self.max_error_rate:
+            return f"error rate {stats['error_rate']:.2f} above {self.max_error_rate:.2f}"
+        p95 = stats["p95_seconds"]
+        if route.slo_p95_seconds and p95 is not None and p95 > route.slo_p95_seconds:
+            return f"p95 {p95:.2f}s above SLO {route.slo_p95_seconds:.2f}s"
+        return None
+
+    def choose(self, request_class: str) -> str:
+        """Model to use for the next request of request_class"""
+        route = self.routes[request_class]
+        model, reason = route.primary, "primary"
+        if route.fallback:
+            degraded = self._degraded_reason(request_class, route)
+            if degraded and random.random() >= self.probe_ratio:
+                model, reason = route.fallback, f"fallback: {degraded}"
+            elif degraded:
+                reason = f"probe: {degraded}"
+        registry.counter(f"model_route_{request_class}_{model}").inc()
+        self._last_decisions[request_class] = {"model": model, "reason": reason, "at": time.time()}
+        return model
+
+    def record(self, request_class: str, model: str, seconds: float, ok: bool):
+        """Record the outcome of a call made with model for request_class"""
+        self._stats_for(request_class, model).record(seconds, ok)
+
+    def snapshot(self) -> Dict:
+        """Routes, rolling statistics and the latest decision per request class"""
+        return {
+            request_class: {
+                "route": route.to_dict(),
+                "last_decision": self._last_decisions.get(request_class),
+                "models": {
+                    model: self._stats_for(request_class, model).snapshot()
+                    for model in filter(None, (route.primary, route.fallback))
+                },
+            }
+            for request_class, route in self.routes.items()
+        }
@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from metrics import registry
+
+
+# Lower rank is admitted first. Background work (e.g. conversation summaries)
+# shares the itinerary class.
+PRIORITIES: Dict[str, int] = {"chat": 0, "translate": 1, "itinerary": 2}
+
+# Failures worth another attempt: rate limits, plus the transient errors the
+# SDK would otherwise retry itself (connection errors and timeouts, 5xx)
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+class OpenAILimiter:
+    """Admission control for OpenAI calls shared by every endpoint.
+
+    Calls wait for one of ``max_concurrency`` slots and for their estimated
+    tokens in a tokens-per-minute bucket; waiting calls are admitted strictly
+    by priority class (chat, then translate, then itinerary), FIFO within a
+    class. Once a call reports usage the bucket is corrected to the actual
+    token count. A 429, connection error, timeout or 5xx releases the slot,
+    sleeps with full-jitter exponential backoff (or the server's Retry-After)
+    and queues again, up to ``max_retries`` times; the OpenAI client itself
+    is created with ``max_retries=0``. ``tokens_per_minute=0`` disables token
+    budgeting.
+    """
+
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, max_retries: int,
+                 backoff_base: float, backoff_max: float):
+        self.max_concurrency = max_concurrency
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._active = 0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._queue_wait = registry.histogram("openai_limiter_queue_wait_seconds")
+        self._class_queue_wait = {
+            name: registry.histogram(f"openai_limiter_{name}_queue_wait_seconds") for name in PRIORITIES
+        }
+        self._rate_limited = registry.counter("openai_limiter_rate_limited")
+        self._transient_errors = registry.counter("openai_limiter_transient_errors")
+        self._retries = registry.counter("openai_limiter_retries")
+        registry.gauge("openai_limiter_active", lambda: self._active)
+        registry.gauge("openai_limiter_queued", lambda: len(self._waiters))
+        registry.gauge("openai_limiter_tokens_available", self.tokens_available)
+
+    def tokens_available(self) -> Optional[float]:
+        if not self.capacity:
+            return None
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _dispatch(self):
+        """Admit queued calls in priority order while slots and tokens allow"""
+        self._wakeup = None
+        if self.capacity:
+            self._refill()
+        while self._waiters and self._active < self.max_concurrency:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.capacity:
+                # A call larger than the whole bucket waits for a full bucket
+                needed = min(tokens, self.capacity)
+                if self._tokens < needed:
+                    if self._wakeup is None:
+                        delay = (needed - self._tokens) / self.rate
+                        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                    return
+                self._tokens -= needed
+            heapq.heappop(self._waiters)
+            self._active += 1
+            future.set_result(None)
+
+    async def _acquire(self, priority: str, tokens: float):
+        future = asyncio.get_running_loop().create_future()
+        entry = (PRIORITIES[priority], next(self._sequence), tokens, future)
+        heapq.heappush(self._waiters, entry)
+        start = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+        waited = time.perf_counter() - start
+        self._queue_wait.observe(waited)
+        self._class_queue_wait[priority].observe(waited)
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _settle(self, estimated: float, response: Any):
+        """Refund (or charge) the difference between estimated and reported tokens"""
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None)
+        if self.capacity and isinstance(total, int):
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + min(estimated, self.capacity) - total)
+
+    def _count_failure(self, error: Exception):
+        if isinstance(error, RateLimitError):
+            self._rate_limited.inc()
+        else:
+            self._transient_errors.inc()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def call(self, priority: str, estimated_tokens: float, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once admitted, retrying rate-limited and transiently failed attempts"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, estimated_tokens)
+            try:
+                response = await fn()
+            except RETRYABLE_ERRORS as e:
+                self._count_failure(e)
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+            else:
+                self._settle(estimated_tokens, response)
+                return response
+            finally:
+                self._release()
+            self._retries.inc()
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, priority: str, estimated_tokens: float,
+                     fn: Callable[[], Awaitable[Any]]) -> AsyncIterator[Any]:
+        """Like ``call`` for streaming requests; the slot is held until the block exits"""
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, estimated_tokens)
+            try:
+                stream = await fn()
+            except RETRYABLE_ERRORS as e:
+                self._release()
+                self._count_failure(e)
+                if attempt == self.max_retries:
+                    raise
+                self._retries.inc()
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            except BaseException:
+                self._release()
+                raise
+            try:
+                yield stream
+            finally:
+                self._release()
+            return
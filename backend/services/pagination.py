@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(sort_value: datetime, row_id: str) -> str:
+    """Opaque cursor for the (sort_value, id) keyset of the last row on a page"""
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def keyset_paginate(
+    stmt: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+    dialect_name: str,
+    descending: bool = True,
+) -> Select:
+    """Order stmt by (sort_column, id_column) and seek past cursor.
+
+    Fetches one row more than limit so split_page can tell whether another
+    page exists. Cost per page is constant given an index on the keyset.
+    """
+    if descending:
+        stmt = stmt.order_by(sort_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(sort_column.asc(), id_column.asc())
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if dialect_name == "sqlite":
+            # SQLite stores timestamps as text; compare in its own format so
+            # server-default values (no fractional seconds) order correctly.
+            sort_value = sort_value.replace(tzinfo=None).isoformat(sep=" ")
+        keyset = tuple_(sort_column, id_column)
+        bound = tuple_(sort_value, row_id)
+        stmt = stmt.where(keyset < bound if descending else keyset > bound)
+
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, key: Callable[[Any], Tuple[datetime, str]]) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build next_cursor from the last row kept"""
+    items = list(rows[:limit])
+    if len(rows) <= limit or not items:
+        return items, None
+    return items, encode_cursor(*key(items[-1]))
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from passlib.context import CryptContext
+
+from metrics import registry
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full and the request should be shed"""
+
+
+class PasswordHasher:
+    """Runs password hashing on a bounded thread pool off the event loop.
+
+    bcrypt releases the GIL while it works, so a small thread pool gives real
+    parallelism without blocking other requests. At most ``max_workers`` hashes
+    run at once and at most ``max_queue`` more may wait; beyond that callers get
+    ``HasherBusyError`` so a login burst is shed instead of queueing unbounded.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._queue_wait = registry.histogram("password_hash_queue_wait_seconds")
+        self._duration = registry.histogram("password_hash_duration_seconds")
+        self._rejected = registry.counter("password_hash_rejected")
+        registry.gauge("password_hash_queue_depth", lambda: self.queue_depth)
+        registry.gauge("password_hash_running", lambda: self._running)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of hash operations waiting for a worker"""
+        return self._pending - self._running
+
+    def _timed(self, submitted: float, fn: Callable, *args):
+        started = time.perf_counter()
+        self._queue_wait.observe(started - submitted)
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._duration.observe(time.perf_counter() - started)
+
+    async def _submit(self, fn: Callable, *args):
+        if self.queue_depth >= self.max_queue:
+            self._rejected.inc()
+            raise HasherBusyError("Password hashing queue is full")
+        with self._lock:
+            self._pending += 1
+        future = self._executor.submit(self._timed, time.perf_counter(), fn, *args)
+        # Count the job until it finishes (or is cancelled before it starts), even if the caller is cancelled
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password"""
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        """Wait for in-flight hashes and stop the worker threads"""
+        self._executor.shutdown(wait=True)
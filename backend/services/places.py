@@ -0,0 +1,65 @@
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import httpx
+
+from metrics import registry
+
+
+PLACES_API_URL = "https://maps.googleapis.com/maps/api/place"
+
+
+class PlacesApiError(Exception):
+    """The Places API answered with a status other than OK or ZERO_RESULTS"""
+
+    def __init__(self, status: str, message: Optional[str] = None):
+        super().__init__(f"{status}: {message}" if message else status)
+        self.status = status
+
+
+class PlacesClient:
+    """Async client for the Google Places web service.
+
+    A drop-in for the ``googlemaps.Client`` calls the API makes:
+    ``places_nearby`` and ``place`` take the same arguments and return the
+    same response bodies, but run on a shared ``httpx.AsyncClient`` instead
+    of blocking the event loop. Error statuses raise ``PlacesApiError``.
+    """
+
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient, base_url: str = PLACES_API_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self._http = http_client
+        self._latency = {
+            endpoint: registry.histogram(f"places_{endpoint}_latency_seconds") for endpoint in ("nearby", "details")
+        }
+        self._errors = registry.counter("places_errors")
+
+    async def _get(self, endpoint: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = await self._http.get(f"{self.base_url}/{path}/json", params={**params, "key": self.api_key})
+            response.raise_for_status()
+            body = response.json()
+            if body.get("status") not in ("OK", "ZERO_RESULTS"):
+                raise PlacesApiError(body.get("status", "UNKNOWN_ERROR"), body.get("error_message"))
+            return body
+        except Exception:
+            self._errors.inc()
+            raise
+        finally:
+            self._latency[endpoint].observe(time.perf_counter() - started)
+
+    async def places_nearby(self, location: Tuple[float, float], radius: int, type: Optional[str] = None) -> Dict[str, Any]:
+        """Nearby Search around (lat, lng)"""
+        params: Dict[str, Any] = {"location": f"{location[0]},{location[1]}", "radius": radius}
+        if type:
+            params["type"] = type
+        return await self._get("nearby", "nearbysearch", params)
+
+    async def place(self, place_id: str, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Place Details for place_id, limited to fields when given"""
+        params: Dict[str, Any] = {"place_id": place_id}
+        if fields:
+            params["fields"] = ",".join(fields)
+        return await self._get("details", "details", params)
@@ -0,0 +1,152 @@
+import json
+import math
+import string
+import textwrap
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from metrics import registry
+
+try:
+    import tiktoken
+except ImportError:  # installed from requirements.txt; without it token counts are a character estimate
+    tiktoken = None
+
+
+# Average characters per token for English text in OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+sections_trimmed = registry.counter("prompt_sections_trimmed")
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Encoding files could not be loaded (e.g. offline); stay on the estimate
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text (exact with tiktoken installed, otherwise estimated)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: Sequence[Dict[str, str]]) -> int:
+    """Prompt tokens for a chat completion request, including per-message overhead"""
+    return sum(count_tokens(message["content"]) + 4 for message in messages) + 3
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens tokens, marking the cut"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    sections_trimmed.inc()
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max(max_tokens - 1, 0)]) + "…"
+    return text[:max(max_tokens - 1, 0) * CHARS_PER_TOKEN] + "…"
+
+
+def compact_json(value: Any) -> str:
+    """JSON without the whitespace json.dumps adds by default"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _prune(value: Any) -> Any:
+    """Drop null and empty values, which cost tokens but carry nothing"""
+    if isinstance(value, dict):
+        pruned = {key: _prune(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [_prune(item) for item in value if item not in (None, "", [], {})]
+    return value
+
+
+def _shrink(value: Any, max_chars: int, max_items: int) -> Any:
+    """Shorten long strings and lists throughout a JSON value"""
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_chars, max_items) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shrink(item, max_chars, max_items) for item in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + "…"
+    return value
+
+
+def fit_json(value: Any, max_tokens: int) -> str:
+    """Serialize value compactly, trimming it until it fits in max_tokens.
+
+    Empty values are dropped first, then long strings and lists are
+    shortened, and as a last resort trailing top-level keys are left out.
+    """
+    text = compact_json(value)
+    if count_tokens(text) <= max_tokens:
+        return text
+    sections_trimmed.inc()
+    value = _prune(value)
+    for max_chars, max_items in ((400, 20), (120, 8), (40, 3)):
+        shrunk = _shrink(value, max_chars, max_items)
+        text = compact_json(shrunk)
+        if count_tokens(text) <= max_tokens:
+            return text
+    if isinstance(shrunk, dict):
+        kept: Dict[str, Any] = {}
+        for key, item in shrunk.items():
+            if count_tokens(compact_json({**kept, key: item})) > max_tokens:
+                break
+            kept[key] = item
+        return compact_json(kept)
+    return truncate_text(text, max_tokens)
+
+
+class PromptTemplate:
+    """A ``str.format`` prompt parsed once at import, with per-section token budgets.
+
+    Leading indentation is stripped from the template. Non-string section
+    values are rendered as compact JSON; sections with a budget are trimmed
+    to fit it (``fit_json`` / ``truncate_text``). Lines whose placeholders
+    are all ``optional`` and empty are left out of the prompt, along with
+    the blank line that would otherwise double up.
+    """
+
+    def __init__(self, template: str, budgets: Optional[Dict[str, int]] = None, optional: Sequence[str] = ()):
+        self.template = textwrap.dedent(template).strip()
+        self.budgets = budgets or {}
+        self.optional = set(optional)
+        self._lines: List[Tuple[str, List[str]]] = [
+            (line, [field for _, field, _, _ in string.Formatter().parse(line) if field])
+            for line in self.template.split("\n")
+        ]
+        self.fields = {field for _, fields in self._lines for field in fields}
+
+    def _render_section(self, name: str, value: Any) -> str:
+        if value is None:
+            return ""
+        budget = self.budgets.get(name)
+        if isinstance(value, str):
+            return truncate_text(value, budget) if budget else value
+        if isinstance(value, (dict, list)):
+            if not value:
+                return ""
+            return fit_json(value, budget) if budget else compact_json(value)
+        return str(value)
+
+    def render(self, **sections: Any) -> str:
+        """Fill in the template"""
+        values = {name: self._render_section(name, sections.get(name)) for name in self.fields}
+        lines = []
+        for line, fields in self._lines:
+            if fields and all(field in self.optional and not values[field] for field in fields):
+                continue
+            line = line.format(**values)
+            # Dropping a section must not leave a run of blank lines behind
+            if line.strip() or (lines and lines[-1].strip()):
+                lines.append(line)
+        return "\n".join(lines).strip()
@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from metrics import registry
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller starts ``fn`` as its own task; callers arriving while it
+    runs await the same task instead of starting another. The task is
+    shielded, so one caller disconnecting does not cancel the work for the
+    others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = registry.counter(f"{name}_coalesced")
+        registry.gauge(f"{name}_inflight", lambda: len(self._inflight))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[asyncio.Task, bool]:
+        """The task in flight for key, starting fn as a new one if there is none.
+
+        Returns ``(task, shared)``. Callers must not cancel the task; await it
+        through ``asyncio.shield`` or wait for it to finish.
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced.inc()
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task, shared
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn for key, or join the call already in flight for key.
+
+        Returns ``(result, shared)`` where ``shared`` is True if this caller
+        joined another caller's call.
+        """
+        task, shared = self.start(key, fn)
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            task.exception()
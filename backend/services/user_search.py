@@ -0,0 +1,205 @@
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, or_, and_, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import User as UserModel
+
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_search_statement(query: str, limit: int):
+    """Ranked user search backed by pg_trgm GIN indexes (PostgreSQL only).
+
+    Substring and fuzzy (trigram similarity) matches are returned; prefix
+    matches on username or any word of full_name rank first, then similarity.
+    """
+    escaped = escape_like(query)
+    contains = f"%{escaped}%"
+    prefix = f"{escaped}%"
+    word_prefix = f"% {escaped}%"
+    is_prefix = or_(
+        UserModel.username.ilike(prefix, escape="\\"),
+        UserModel.full_name.ilike(prefix, escape="\\"),
+        UserModel.full_name.ilike(word_prefix, escape="\\"),
+    )
+    similarity = func.greatest(
+        func.similarity(UserModel.username, query),
+        func.similarity(UserModel.full_name, query),
+    )
+    return (
+        select(UserModel)
+        .where(
+            or_(
+                UserModel.username.ilike(contains, escape="\\"),
+                UserModel.full_name.ilike(contains, escape="\\"),
+                UserModel.username.op("%")(query),
+                UserModel.full_name.op("%")(query),
+            ),
+            UserModel.is_active == True,
+        )
+        .order_by(case((is_prefix, 0), else_=1), similarity.desc(), UserModel.username)
+        .limit(limit)
+    )
+
+
+def word_trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class UserSearchIndex:
+    """In-memory trigram index over active users for databases without pg_trgm.
+
+    Mirrors the PostgreSQL ranking: substring matches of the whole query on
+    username/full_name (so "na ro" finds "Alena Rossi", across the word
+    break), prefix matches first, then trigram similarity. Unlike
+    PostgreSQL, fuzzy matching of typos is not done, and queries shorter
+    than three characters match the start of a word rather than any
+    substring. The index loads lazily on
+    first search and then, at most every ``sync_interval`` seconds, pulls only
+    rows created or updated since its last sync, so registrations and profile
+    changes from any worker are picked up.
+    """
+
+    def __init__(self, sync_interval: float = 1.0):
+        self.sync_interval = sync_interval
+        self._last_sync = 0.0
+        self._ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._docs: Dict[int, Tuple[str, str, Set[str]]] = {}
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._synced_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, user_id: str, username: str, full_name: str):
+        """Index (or re-index) a user"""
+        self.remove(user_id)
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._ids.append(user_id)
+            self._slots[user_id] = slot
+        grams = word_trigrams(username) | word_trigrams(full_name)
+        self._docs[slot] = (username.lower(), full_name.lower(), grams)
+        for gram in grams:
+            self._postings[gram].add(slot)
+
+    def remove(self, user_id: str):
+        """Drop a user from the index"""
+        slot = self._slots.get(user_id)
+        doc = self._docs.pop(slot, None) if slot is not None else None
+        if doc is None:
+            return
+        for gram in doc[2]:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(slot)
+                if not postings:
+                    del self._postings[gram]
+
+    def _candidates(self, query: str) -> Iterable[int]:
+        words = _WORD_RE.findall(query)
+        if not words:
+            return ()
+        candidate_sets = []
+        for index, word in enumerate(words):
+            if len(word) >= 3:
+                # Every trigram of a substring appears among the word's padded trigrams
+                grams = [word[i:i + 3] for i in range(len(word) - 2)]
+            elif index == 0 and len(words) > 1:
+                # Followed by a word break, so it may be the end of a longer word
+                grams = [f"{word} "] if len(word) == 2 else []
+            else:
+                # Starts a word: a whole word mid-query, or a word prefix at the end
+                grams = [f"  {word}"[-3:]]
+            for gram in grams:
+                candidate_sets.append(self._postings.get(gram, set()))
+        candidate_sets.sort(key=len)
+        return set.intersection(*candidate_sets) if candidate_sets else ()
+
+    def search(self, query: str, limit: int = 10) -> List[str]:
+        """Return ids of the best matching users, best first"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        query_grams = word_trigrams(query)
+        ranked = []
+        for slot in self._candidates(query):
+            username, full_name, grams = self._docs[slot]
+            if query not in username and query not in full_name and len(query) >= 3:
+                continue
+            is_prefix = (
+                username.startswith(query)
+                or full_name.startswith(query)
+                or f" {query}" in full_name
+            )
+            similarity = len(query_grams & grams) / len(query_grams | grams)
+            ranked.append((0 if is_prefix else 1, -similarity, username, slot))
+        ranked.sort()
+        return [self._ids[slot] for *_, slot in ranked[:limit]]
+
+    async def sync(self, db: AsyncSession):
+        """Pull users created or updated since the last sync"""
+        if self._synced_at is not None and time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = time.monotonic()
+        stmt = select(
+            UserModel.id, UserModel.username, UserModel.full_name, UserModel.is_active,
+            func.coalesce(UserModel.updated_at, UserModel.created_at)
+        )
+        if self._synced_at is not None:
+            # Re-read a second of overlap; server timestamps may have second resolution
+            since = self._synced_at - timedelta(seconds=1)
+            stmt = stmt.where(or_(
+                UserModel.created_at >= since,
+                and_(UserModel.updated_at.isnot(None), UserModel.updated_at >= since)
+            ))
+        result = await db.stream(stmt.execution_options(yield_per=5000))
+        async for user_id, username, full_name, is_active, changed_at in result:
+            if is_active:
+                self.add(user_id, username, full_name)
+            else:
+                self.remove(user_id)
+            if changed_at is not None:
+                changed_at = changed_at.replace(tzinfo=None)
+                if self._synced_at is None or changed_at > self._synced_at:
+                    self._synced_at = changed_at
+        if self._synced_at is None:
+            self._synced_at = datetime(1970, 1, 1)
+
+
+user_search_index = UserSearchIndex()
+
+
+async def search_users(db: AsyncSession, query: str, limit: int = 10) -> List[UserModel]:
+    """Ranked search over active users by username or full name"""
+    if db.bind.dialect.name == "postgresql":
+        result = await db.execute(trigram_search_statement(query, limit))
+        return list(result.scalars().all())
+
+    await user_search_index.sync(db)
+    user_ids = user_search_index.search(query, limit)
+    if not user_ids:
+        return []
+    result = await db.execute(
+        select(UserModel).where(UserModel.id.in_(user_ids), UserModel.is_active == True)
+    )
+    users = {user.id: user for user in result.scalars().all()}
+    return [users[user_id] for user_id in user_ids if user_id in users]